@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Query, BackgroundTasks # Added Bac
 from typing import List, Dict, Any
 import logging
 
-from app.services.rss_fetcher import fetch_all_articles
+from app.services.rss_fetcher import fetch_all_articles_async
 from app.models.article import Article
 from app.services import article_service # Adjusted import
 
@@ -18,7 +18,7 @@ async def fetch_and_save_articles_endpoint():
     """
     try:
         logger.info("API: Initiating article fetch from all RSS feeds.")
-        fetched_articles = fetch_all_articles()
+        fetched_articles = await fetch_all_articles_async()
         
         if not fetched_articles:
             logger.info("API: No new articles were fetched from RSS feeds.")
@@ -33,6 +33,7 @@ async def fetch_and_save_articles_endpoint():
             "fetched_count": len(fetched_articles),
             "inserted_count": save_result.get("inserted", 0),
             "updated_count": save_result.get("updated", 0),
+            "unchanged_count": save_result.get("unchanged", 0),
             "failed_count": save_result.get("failed", 0)
             # Removed analyzed_count as it's now a separate step
         }
@@ -67,6 +68,9 @@ async def deep_analyze_article_endpoint(article_id: str):
     Triggers a deep analysis for a specific article using a more powerful LLM.
     The article must exist in the database.
     """
+    if not article_service.llm_service.client:
+        raise HTTPException(status_code=503, detail="LLM client is not configured; deep analysis is unavailable.")
+
     try:
         logger.info(f"API: Initiating deep analysis for article_id: {article_id}")
         updated_article = await article_service.perform_deep_article_analysis(article_id)
@@ -120,7 +124,7 @@ async def get_related_articles_endpoint(article_id: str):
     """
     try:
         logger.info(f"API: Getting related articles for article_id: {article_id}")
-        related_articles = await article_service.get_related_articles(article_id)
+        related_articles = await article_service.get_related_articles_raw(article_id)
         
         if not related_articles:
             logger.info(f"API: No related articles found for article_id: {article_id}")
@@ -149,14 +153,14 @@ async def analyze_related_articles_endpoint(article_id: str, background_tasks: B
         logger.info(f"API: Initiating comparative analysis for articles related to article_id: {article_id}")
         
         # First, get related articles to check if we have enough for comparison
-        related_articles = await article_service.get_related_articles(article_id)
+        related_articles = await article_service.get_related_articles_raw(article_id)
         
         if not related_articles or len(related_articles) < 2:
             logger.warning(f"API: Not enough related articles found for comparative analysis. Found: {len(related_articles) if related_articles else 0}")
             raise HTTPException(status_code=400, detail="Insufficient related articles for comparison (minimum 2 required)")
         
         # Include the original article in the analysis if it's not already in the related list
-        all_article_ids = [str(article.id) for article in related_articles]
+        all_article_ids = [article["id"] for article in related_articles]
         if article_id not in all_article_ids:
             all_article_ids.append(article_id)
             
@@ -0,0 +1,66 @@
+"""
+One-time script to store title_tokens and llm_key_claim_tokens on articles saved before those
+fields were introduced. Related-article scoring falls back to splitting titles server-side for
+those documents, and their key claims can't be matched at all until the tokens are stored.
+"""
+import asyncio
+import logging
+from pymongo import UpdateOne
+from app.db import connect_to_mongo, close_mongo_connection, get_article_collection
+from app.models.article import tokenize_key_claim, tokenize_title
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+async def backfill_scoring_tokens():
+    """
+    Computes title_tokens and llm_key_claim_tokens for every article missing either, writing in batches.
+    """
+    logger.info("Backfilling title and key-claim tokens...")
+    try:
+        collection = await get_article_collection()
+        cursor = collection.find(
+            {"$or": [
+                {"title_tokens": {"$exists": False}},
+                {"llm_key_claim": {"$type": "string"}, "llm_key_claim_tokens": {"$exists": False}}
+            ]},
+            {"title": 1, "llm_key_claim": 1}
+        ).batch_size(BATCH_SIZE)
+        
+        operations = []
+        updated_count = 0
+        async for doc in cursor:
+            tokens = {"title_tokens": tokenize_title(doc.get("title") or "")}
+            if doc.get("llm_key_claim"):
+                tokens["llm_key_claim_tokens"] = tokenize_key_claim(doc["llm_key_claim"])
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": tokens}))
+            if len(operations) >= BATCH_SIZE:
+                result = await collection.bulk_write(operations, ordered=False)
+                updated_count += result.modified_count
+                operations = []
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated_count += result.modified_count
+        
+        logger.info(f"Stored scoring tokens on {updated_count} articles")
+    except Exception as e:
+        logger.error(f"Error backfilling scoring tokens: {str(e)}", exc_info=True)
+
+async def main():
+    """
+    Main function that connects to the database, runs the backfill, and then closes the connection.
+    """
+    await connect_to_mongo()
+    await backfill_scoring_tokens()
+    await close_mongo_connection()
+
+# Execute the script
+if __name__ == "__main__":
+    asyncio.run(main())
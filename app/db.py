@@ -1,4 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo.errors import OperationFailure
+from typing import List
 import logging
 
 from config.settings import settings
@@ -8,14 +10,11 @@ logger = logging.getLogger(__name__)
 class DBManager:
     client: AsyncIOMotorClient = None
     db: AsyncIOMotorDatabase = None
+    index_warnings: List[str] = [] # Index problems that need operator action; reported by /health
 
 async def connect_to_mongo():
     logger.info("Connecting to MongoDB (async)...")
-    # Fix potential escape sequences in the URL
     db_url = settings.DATABASE_URL
-    if '\\x3a' in db_url:
-        db_url = db_url.replace('\\x3a', ':')
-        logger.info(f"Fixed escape sequences in DATABASE_URL: {db_url}")
     
     DBManager.client = AsyncIOMotorClient(db_url)
     # Extract database name from DATABASE_URL or use a default
@@ -63,10 +62,24 @@ async def create_indexes():
             name="source_name_index"
         )
         
-        # Create index on llm_category for faster category filtering
+        # Compound index on category and date; also serves plain category filtering
         await collection.create_index(
-            [("llm_category", 1)],
-            name="category_index"
+            [("llm_category", 1), ("publication_date", -1)],
+            name="category_publication_date_index"
+        )
+        
+        # Multikey indexes for the keyword/entity branches of the related-articles query
+        await collection.create_index(
+            [("llm_keywords", 1)],
+            name="llm_keywords_index"
+        )
+        await collection.create_index(
+            [("llm_entities.text", 1)],
+            name="llm_entities_text_index"
+        )
+        await collection.create_index(
+            [("llm_key_claim_tokens", 1)],
+            name="llm_key_claim_tokens_index"
         )
         
         logger.info("All MongoDB indexes created successfully")
@@ -74,6 +87,40 @@ async def create_indexes():
         logger.error(f"Error creating MongoDB indexes: {str(e)}", exc_info=True)
         # Don't raise the exception to allow the application to start even if index creation fails
 
+    await create_url_index()
+
+async def create_url_index():
+    """
+    Creates the unique URL index that backs the upserts and the content-hash lookup in save_articles.
+    If the collection already holds duplicate URLs the unique index cannot be built: the duplicates are
+    reported through DBManager.index_warnings (and /health), and a non-unique index is created instead
+    so URL lookups stay indexed until the duplicates are removed.
+    """
+    DBManager.index_warnings = []
+    collection = await get_article_collection()
+    try:
+        await collection.create_index([("url", 1)], unique=True, name="url_unique_index")
+        return
+    except OperationFailure as e:
+        if e.code != 11000: # Not a duplicate key error
+            logger.error(f"Error creating unique URL index: {e}", exc_info=True)
+            DBManager.index_warnings.append(f"Unique URL index could not be created: {e}")
+            return
+
+    duplicates = await collection.aggregate([
+        {"$group": {"_id": "$url", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 5}
+    ]).to_list(length=None)
+    sample_urls = ", ".join(str(duplicate["_id"]) for duplicate in duplicates)
+    message = f"Unique URL index not created: articles collection has duplicate URLs (e.g. {sample_urls}); remove them and restart"
+    logger.error(message)
+    DBManager.index_warnings.append(message)
+    try:
+        await collection.create_index([("url", 1)], name="url_index")
+    except Exception as e:
+        logger.error(f"Error creating fallback URL index: {e}", exc_info=True)
+
 async def close_mongo_connection():
     if DBManager.client:
         logger.info("Closing MongoDB connection (async)...")
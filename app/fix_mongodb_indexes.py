@@ -47,10 +47,24 @@ async def create_mongodb_indexes():
             name="source_name_index"
         )
         
-        # Create index on llm_category for faster category filtering
+        # Compound index on category and date; also serves plain category filtering
         await collection.create_index(
-            [("llm_category", 1)],
-            name="category_index"
+            [("llm_category", 1), ("publication_date", -1)],
+            name="category_publication_date_index"
+        )
+        
+        # Multikey indexes for the keyword/entity branches of the related-articles query
+        await collection.create_index(
+            [("llm_keywords", 1)],
+            name="llm_keywords_index"
+        )
+        await collection.create_index(
+            [("llm_entities.text", 1)],
+            name="llm_entities_text_index"
+        )
+        await collection.create_index(
+            [("llm_key_claim_tokens", 1)],
+            name="llm_key_claim_tokens_index"
         )
         
         # Create index on URL for faster retrieval and deduplication
@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import logging
@@ -16,7 +17,9 @@ logger = logging.getLogger(__name__)
 # Import DB connection functions
 from app.api import articles  # Absolute import from 'app' package
 from app.api import db_visualization  # Import the new DB visualization router
-from app.db import connect_to_mongo, close_mongo_connection, create_indexes # Added create_indexes import
+from app.db import DBManager, connect_to_mongo, close_mongo_connection, create_indexes # Added create_indexes import
+from app.services.rss_fetcher import shutdown_parse_pool
+from app.services.llm_service import close_clients as close_llm_clients
 
 # Define a lifespan context manager to replace on_event handlers
 @asynccontextmanager
@@ -31,6 +34,8 @@ async def lifespan(app):
     # Shutdown logic
     logger.info("Application is shutting down...")
     await close_mongo_connection()  # Close DB connection asynchronously
+    shutdown_parse_pool()  # Stop feed parsing worker processes
+    await close_llm_clients()  # Close the shared LLM HTTP connection pool
     # Future: Close database connections, cleanup resources, etc.
 
 # Create FastAPI app with the lifespan manager
@@ -38,12 +43,15 @@ app = FastAPI(
     title="News Aggregator API",
     version="0.1.0",
     description="API for discovering, analyzing, and presenting news from various sources.",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse # orjson is already a dependency and serializes much faster than json
 )
 
 @app.get("/health", tags=["System"])
 async def health_check():
-    """Provides a basic health check for the application."""
+    """Provides a basic health check for the application, including database index problems."""
+    if DBManager.index_warnings:
+        return {"status": "degraded", "message": "News Aggregator API is running.", "warnings": DBManager.index_warnings}
     return {"status": "healthy", "message": "News Aggregator API is running."}
 
 # Include routers from the api module
@@ -0,0 +1,53 @@
+"""
+One-time script to normalize stored llm_entities to the canonical [{"text": ..., "type": ...}] shape.
+Older triage runs stored bare entity names as strings; run this script once to rewrite them.
+"""
+import asyncio
+import logging
+from app.db import connect_to_mongo, close_mongo_connection, get_article_collection
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+async def migrate_llm_entities():
+    """
+    Rewrites every string entry in llm_entities as {"text": <string>}, leaving dict entries untouched.
+    """
+    logger.info("Normalizing llm_entities...")
+    try:
+        collection = await get_article_collection()
+        
+        # Matches documents whose llm_entities array contains at least one string
+        result = await collection.update_many(
+            {"llm_entities": {"$type": "string"}},
+            [{
+                "$set": {
+                    "llm_entities": {
+                        "$map": {
+                            "input": "$llm_entities",
+                            "in": {"$cond": [{"$eq": [{"$type": "$$this"}, "string"]}, {"text": "$$this"}, "$$this"]}
+                        }
+                    }
+                }
+            }]
+        )
+        logger.info(f"Normalized llm_entities in {result.modified_count} articles")
+    except Exception as e:
+        logger.error(f"Error normalizing llm_entities: {str(e)}", exc_info=True)
+
+async def main():
+    """
+    Main function that connects to the database, runs the migration, and then closes the connection.
+    """
+    await connect_to_mongo()
+    await migrate_llm_entities()
+    await close_mongo_connection()
+
+# Execute the script
+if __name__ == "__main__":
+    asyncio.run(main())
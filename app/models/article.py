@@ -1,8 +1,38 @@
-from pydantic import BaseModel, Field, HttpUrl, ConfigDict
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, HttpUrl, ConfigDict, field_validator
+from typing import Optional, List, Dict, Any, TypedDict
 from datetime import datetime, timezone
+from functools import cached_property
 import uuid
 
+# Common words ignored when comparing titles and key claims of related articles
+STOP_WORDS = frozenset({
+    "the", "a", "an", "and", "in", "on", "at", "to", "for", "with", "by", "of", "is", "are",
+    "that", "this", "it", "as"
+})
+
+def tokenize_title(title: str) -> List[str]:
+    """Returns the distinct lower-cased title words, minus stop words, used for title-overlap scoring."""
+    return sorted(set(title.lower().split()) - STOP_WORDS)
+
+def tokenize_key_claim(key_claim: str) -> List[str]:
+    """Returns the significant key-claim words (lower-cased, no stop words, longer than 3 chars) in order."""
+    return list(dict.fromkeys(word for word in key_claim.lower().split() if word not in STOP_WORDS and len(word) > 3))
+
+def normalize_entities(entities: Any) -> List[Dict[str, str]]:
+    """
+    Normalizes stored/LLM entities to the canonical [{"text": ..., "type": ...}] shape.
+    Older documents stored bare entity names as strings; dicts without a "text" key are dropped.
+    """
+    if not entities:
+        return []
+    normalized = []
+    for entity in entities:
+        if isinstance(entity, str):
+            normalized.append({"text": entity})
+        elif isinstance(entity, dict) and "text" in entity:
+            normalized.append({key: value for key, value in entity.items() if isinstance(value, str)})
+    return normalized
+
 class Article(BaseModel):
     id: Optional[str] = None  # Changed to None default to pass test_article_creation_valid
     title: str
@@ -33,6 +63,25 @@ class Article(BaseModel):
     related_article_ids: List[str] = []
     comparative_analysis_id: Optional[str] = None # ID referencing detailed comparative analysis in the analyses collection
     
+    # Scoring inputs derived from the LLM fields, computed on first access and then reused.
+    # They are not refreshed if the underlying fields are reassigned afterwards.
+    @cached_property
+    def distinct_keywords(self) -> List[str]:
+        return list(dict.fromkeys(self.llm_keywords))
+
+    @cached_property
+    def entity_texts(self) -> List[str]:
+        return list(dict.fromkeys(entity["text"] for entity in self.llm_entities))
+
+    @cached_property
+    def title_tokens(self) -> List[str]:
+        return tokenize_title(self.title) if self.title else []
+
+    @field_validator("llm_entities", mode="before")
+    @classmethod
+    def _normalize_llm_entities(cls, value: Any) -> List[Dict[str, str]]:
+        return normalize_entities(value)
+
     # Use ConfigDict instead of class-based Config (Pydantic v2 recommendation)
     model_config = ConfigDict(
         populate_by_name=True,  # Allows populating model by field name or alias
@@ -43,3 +92,33 @@ class Article(BaseModel):
         #     HttpUrl: lambda v: str(v),
         # }
     )
+
+
+class ArticleRead(TypedDict, total=False):
+    """
+    Plain-dict shape of an article document as read from MongoDB.
+    Used on read-only paths that hand documents straight to a response_model,
+    so they are validated once at serialization instead of once per layer.
+    """
+    id: str
+    title: str
+    url: str
+    source_name: str
+    source_type: str
+    content: Optional[str]
+    summary: Optional[str]
+    fetched_date: datetime
+    publication_date: Optional[datetime]
+    llm_processed_date: Optional[datetime]
+    llm_category: Optional[str]
+    llm_sentiment: Optional[str]
+    llm_key_claim: Optional[str]
+    llm_entities: List[Dict[str, str]]
+    llm_keywords: List[str]
+    llm_requires_deep_analysis: Optional[bool]
+    llm_deep_analysis_results: Optional[Dict[str, Any]]
+    llm_analysis_raw_response: Optional[Dict[str, Any]]
+    embedding: Optional[List[float]]
+    cluster_id: Optional[str]
+    related_article_ids: List[str]
+    comparative_analysis_id: Optional[str]
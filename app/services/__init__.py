@@ -1,4 +1,4 @@
-from .rss_fetcher import fetch_articles_from_feed, fetch_all_articles
+from .rss_fetcher import fetch_articles_from_feed, fetch_all_articles, fetch_all_articles_async
 from .article_service import (
     save_articles,
     list_articles,
@@ -9,6 +9,7 @@ from .article_service import (
 __all__ = [
     "fetch_articles_from_feed",
     "fetch_all_articles", 
+    "fetch_all_articles_async",
     "save_articles",
     "list_articles",
     "analyze_and_enrich_article",
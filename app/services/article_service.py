@@ -1,27 +1,32 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pymongo import UpdateOne, DESCENDING
 import logging # Added logging
 from datetime import datetime, timedelta, timezone
 from bson import ObjectId
-import re # Import re for regular expressions
+from bson.errors import InvalidId
 import json # Import json for parsing and serializing
+import orjson
+import hashlib
+import asyncio
 
-from app.models.article import Article
+from app.models.article import Article, ArticleRead, normalize_entities, tokenize_key_claim
 from app.db import get_article_collection # This will now be an async function
 from app.services.llm_service import LLMService
 from config.settings import settings # Added settings import
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of related-article lookups run concurrently when backfilling existing articles
+RELATED_ARTICLES_CONCURRENCY = 16
+# Number of top-scoring candidates considered when linking an article to related ones
+RELATED_CANDIDATE_POOL_SIZE = 50
+
 # Initialize LLMService globally or pass as a dependency
 llm_service = LLMService()
 
 # Prompt template for triage analysis
 TRIAGE_PROMPT_TEMPLATE = """
-You are an expert media analyst evaluating news coverage. Analyze this article content to identify reporting patterns and information framing:
-
-ARTICLE CONTENT:
-{content}
+You are an expert media analyst evaluating news coverage. Analyze the article content given at the end to identify reporting patterns and information framing.
 
 Provide a comprehensive analysis with these components:
 
@@ -86,14 +91,14 @@ Example (partial):
     "use_of_sources": "Multiple cited sources" 
   }
 }
+
+ARTICLE CONTENT:
+{content}
 """
 
 # Prompt template for deep analysis
 DEEP_ANALYSIS_PROMPT_TEMPLATE = """
-You are an expert media analyst conducting a detailed examination of news coverage. Your task is to deeply analyze this article with particular attention to how the source frames information, what aspects it emphasizes or omits, and what this reveals about the source's reporting approach.
-
-ARTICLE CONTENT:
-{content}
+You are an expert media analyst conducting a detailed examination of news coverage. Your task is to deeply analyze the article given at the end with particular attention to how the source frames information, what aspects it emphasizes or omits, and what this reveals about the source's reporting approach.
 
 Analyze the article in detail, covering these essential areas:
 
@@ -161,6 +166,9 @@ Example (partial):
     "context_completeness": "Partial"
   }}
 }}
+
+ARTICLE CONTENT:
+{content}
 """
 
 # JSON schema for triage analysis
@@ -801,9 +809,6 @@ You are an expert in media analysis specializing in comparative news coverage. Y
 
 I'll provide you with information about multiple articles from different sources that cover the same news story. Review this information carefully and create a detailed analysis of how coverage differs across sources.
 
-RELATED ARTICLES COVERING THE SAME STORY:
-{articles_json}
-
 Examine these articles collectively, analyzing how different sources present the same core story. Focus on these key areas:
 
 1. STORY CORE FACTS
@@ -849,8 +854,78 @@ Examine these articles collectively, analyzing how different sources present the
    * Note important limitations or caveats for your comparative analysis
 
 Provide your comprehensive analysis as a JSON object following the exact structure defined in the schema. Be objective, evidence-based, and avoid introducing your own biases.
+
+RELATED ARTICLES COVERING THE SAME STORY:
+{content}
 """
 
+def parse_object_ids(ids: List[str]) -> List[ObjectId]:
+    """Parses id strings into ObjectIds in a single pass, skipping malformed ones."""
+    object_ids = []
+    for id_str in ids:
+        if not isinstance(id_str, str):  # ObjectId(None) would generate a fresh id
+            continue
+        try:
+            object_ids.append(ObjectId(id_str))
+        except InvalidId:
+            continue
+    return object_ids
+
+def get_parsed_analysis(analysis_result: Dict[str, Any]) -> Any:
+    """Returns the analysis JSON, reusing the object the LLM service already parsed when there is one."""
+    parsed = analysis_result.get("parsed")
+    return parsed if parsed is not None else orjson.loads(analysis_result["analysis_text"])
+
+def apply_triage_analysis(article: Article, analysis_result: Optional[Dict[str, Any]]) -> Article:
+    """Copies a triage analysis result from the LLM onto the article."""
+    if analysis_result and isinstance(analysis_result, dict) and 'analysis_text' in analysis_result:
+        raw_text_response = analysis_result.get('analysis_text')
+        # Attempt to parse the text response as JSON
+        import json
+        try:
+            # Check if raw_text_response is not None or empty before trying to parse it
+            if raw_text_response is None or not raw_text_response.strip():
+                logger.error(f"Raw text response is empty or None for {article.url}")
+                article.llm_analysis_raw_response = {"error": "Empty response from LLM"}
+                return article  # Return the original article without modifications
+            
+            # For schema validation errors, handle differently
+            if analysis_result.get('schema_error'):
+                logger.error(f"JSON schema validation error for {article.url}: {analysis_result.get('error')}")
+                article.llm_analysis_raw_response = {
+                    "error": "Schema validation error",
+                    "details": analysis_result.get('error')
+                }
+                return article
+                
+            parsed_llm_data = get_parsed_analysis(analysis_result)
+            article.llm_category = parsed_llm_data.get("category")
+            article.llm_sentiment = parsed_llm_data.get("sentiment")
+            article.llm_key_claim = parsed_llm_data.get("key_claim")
+            article.llm_requires_deep_analysis = str(parsed_llm_data.get("requires_deep_analysis")).lower() == 'yes'
+            # Store keywords for finding related articles
+            article.llm_keywords = parsed_llm_data.get("keywords", [])
+            # Extract entities if present
+            main_entities = parsed_llm_data.get("main_entities", [])
+            if main_entities and isinstance(main_entities, list):
+                # Assignment bypasses model validation, so normalize to the {"text", "type"} shape here
+                article.llm_entities = normalize_entities(main_entities)
+            article.llm_analysis_raw_response = parsed_llm_data # Store the parsed JSON
+            logger.info(f"LLM analysis successful for {article.url}: Category: {article.llm_category}, Sentiment: {article.llm_sentiment}")
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse LLM response as JSON for {article.url}: {raw_text_response}")
+            article.llm_analysis_raw_response = {"error": "JSONDecodeError", "raw_text": raw_text_response}
+        except Exception as e:
+            logger.error(f"Error processing LLM JSON response for {article.url}: {e}", exc_info=True)
+            article.llm_analysis_raw_response = {"error": str(e), "raw_text": raw_text_response}
+    elif analysis_result:
+        logger.warning(f"LLM analysis for {article.url} did not return expected dict structure: {analysis_result}")
+        article.llm_analysis_raw_response = analysis_result # Store whatever was returned
+    else:
+        logger.warning(f"LLM analysis returned no result for {article.url}")
+
+    return article
+
 async def analyze_and_enrich_article(article: Article) -> Article:
     """Analyzes a single article using LLMService and enriches it."""
     if not article.summary and not article.title:
@@ -868,60 +943,10 @@ async def analyze_and_enrich_article(article: Article) -> Article:
                 content=content_to_analyze,
                 prompt_template=TRIAGE_PROMPT_TEMPLATE,
                 model=settings.TRIAGE_LLM_MODEL_NAME or settings.DEFAULT_LLM_MODEL_NAME,
+                temperature=0, # Classification: deterministic output, so repeated articles can be served from the LLM cache
                 json_schema=TRIAGE_JSON_SCHEMA
             )
-            if analysis_result and isinstance(analysis_result, dict) and 'analysis_text' in analysis_result:
-                raw_text_response = analysis_result.get('analysis_text')
-                # Attempt to parse the text response as JSON
-                import json
-                try:
-                    # Check if raw_text_response is not None or empty before trying to parse it
-                    if raw_text_response is None or not raw_text_response.strip():
-                        logger.error(f"Raw text response is empty or None for {article.url}")
-                        article.llm_analysis_raw_response = {"error": "Empty response from LLM"}
-                        return article  # Return the original article without modifications
-                    
-                    # For schema validation errors, handle differently
-                    if analysis_result.get('schema_error'):
-                        logger.error(f"JSON schema validation error for {article.url}: {analysis_result.get('error')}")
-                        article.llm_analysis_raw_response = {
-                            "error": "Schema validation error",
-                            "details": analysis_result.get('error')
-                        }
-                        return article
-                        
-                    parsed_llm_data = json.loads(raw_text_response)
-                    article.llm_category = parsed_llm_data.get("category")
-                    article.llm_sentiment = parsed_llm_data.get("sentiment")
-                    article.llm_key_claim = parsed_llm_data.get("key_claim")
-                    article.llm_requires_deep_analysis = str(parsed_llm_data.get("requires_deep_analysis")).lower() == 'yes'
-                    # Store keywords for finding related articles
-                    article.llm_keywords = parsed_llm_data.get("keywords", [])
-                    # Extract entities if present
-                    main_entities = parsed_llm_data.get("main_entities", [])
-                    if main_entities and isinstance(main_entities, list):
-                        # Only store the entity names (strings) in llm_entities for model compatibility
-                        entity_names = []
-                        for entity in main_entities:
-                            if isinstance(entity, dict) and "text" in entity:
-                                entity_names.append(entity["text"])
-                            elif isinstance(entity, str):
-                                entity_names.append(entity)
-                        article.llm_entities = entity_names
-                    article.llm_analysis_raw_response = parsed_llm_data # Store the parsed JSON
-                    logger.info(f"LLM analysis successful for {article.url}: Category: {article.llm_category}, Sentiment: {article.llm_sentiment}")
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse LLM response as JSON for {article.url}: {raw_text_response}")
-                    article.llm_analysis_raw_response = {"error": "JSONDecodeError", "raw_text": raw_text_response}
-                except Exception as e:
-                    logger.error(f"Error processing LLM JSON response for {article.url}: {e}", exc_info=True)
-                    article.llm_analysis_raw_response = {"error": str(e), "raw_text": raw_text_response}
-            elif analysis_result:
-                logger.warning(f"LLM analysis for {article.url} did not return expected dict structure: {analysis_result}")
-                article.llm_analysis_raw_response = analysis_result # Store whatever was returned
-            else:
-                logger.warning(f"LLM analysis returned no result for {article.url}")
-
+            apply_triage_analysis(article, analysis_result)
         except Exception as e:
             logger.error(f"Error during LLM analysis for article {article.url}: {e}", exc_info=True)
             article.llm_analysis_raw_response = {"error": f"LLM analysis failed: {str(e)}"}
@@ -932,8 +957,13 @@ async def analyze_and_enrich_article(article: Article) -> Article:
 async def perform_deep_article_analysis(article_id: str) -> Optional[Article]:
     """
     Performs deep analysis on a specific article using LLMService and updates it in the DB.
-    Returns the updated article or None if not found or analysis fails.
+    Returns the updated article, or None if the LLM client is unavailable or the article
+    is not found. Callers that need to tell these apart should check llm_service.client first.
     """
+    if not llm_service.client:
+        logger.info(f"LLM client not available. Skipping deep LLM analysis for article: {article_id}")
+        return None
+
     collection = await get_article_collection()
     try:
         # In pymongo, ObjectId needs to be imported and used for querying by _id
@@ -951,11 +981,8 @@ async def perform_deep_article_analysis(article_id: str) -> Optional[Article]:
         return None
 
     # Convert DB doc to Pydantic model
-    article_doc["id"] = str(article_doc["_id"])
-    # Fix llm_entities if it's a list of dicts (convert to list of strings)
-    if "llm_entities" in article_doc and isinstance(article_doc["llm_entities"], list):
-        if article_doc["llm_entities"] and isinstance(article_doc["llm_entities"][0], dict):
-            article_doc["llm_entities"] = [e.get("text", "") for e in article_doc["llm_entities"] if isinstance(e, dict) and "text" in e]
+    article_oid = article_doc["_id"]
+    article_doc["id"] = str(article_oid)
     article = Article(**article_doc)
 
     if not article.summary and not article.title and not article.content:
@@ -965,84 +992,77 @@ async def perform_deep_article_analysis(article_id: str) -> Optional[Article]:
     # Prefer content field if available for deep analysis, then summary, then title
     content_to_analyze = article.content or article.summary or article.title
 
-    if llm_service.client:
-        logger.info(f"Performing DEEP analysis with LLM for article: {article.url}")
-        try:
-            analysis_result = await llm_service.analyze_content(
-                content=content_to_analyze,
-                prompt_template=DEEP_ANALYSIS_PROMPT_TEMPLATE,
-                model=settings.DEEP_ANALYSIS_LLM_MODEL_NAME, # Use specific deep analysis model
-                max_tokens=1000, # Allow more tokens for detailed analysis
-                temperature=0.2, # Lower temperature for more factual/deterministic output
-                json_schema=DEEP_ANALYSIS_JSON_SCHEMA
-            )
+    logger.info(f"Performing DEEP analysis with LLM for article: {article.url}")
+    try:
+        analysis_result = await llm_service.analyze_content(
+            content=content_to_analyze,
+            prompt_template=DEEP_ANALYSIS_PROMPT_TEMPLATE,
+            model=settings.DEEP_ANALYSIS_LLM_MODEL_NAME, # Use specific deep analysis model
+            max_tokens=1000, # Allow more tokens for detailed analysis
+            temperature=0, # Deterministic output, which also lets re-analysis be served from the LLM cache
+            json_schema=DEEP_ANALYSIS_JSON_SCHEMA
+        )
 
-            if analysis_result and isinstance(analysis_result, dict) and 'analysis_text' in analysis_result:
-                raw_text_response = analysis_result.get('analysis_text')
-                import json
-                
-                # Check for schema validation errors first
-                if analysis_result.get('schema_error'):
-                    logger.error(f"JSON schema validation error in deep analysis for {article.url}: {analysis_result.get('error')}")
-                    article.llm_deep_analysis_results = {
-                        "error": "Schema validation error",
-                        "details": analysis_result.get('error')
-                    }
-                    await collection.update_one(
-                        {"_id": ObjectId(article.id)}, 
-                        {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}}
-                    )
-                    return article
+        if analysis_result and isinstance(analysis_result, dict) and 'analysis_text' in analysis_result:
+            raw_text_response = analysis_result.get('analysis_text')
+            import json
+            
+            # Invalid or schema-violating output is not stored, so the article stays eligible for re-analysis
+            if analysis_result.get('schema_error') or analysis_result.get('error'):
+                logger.error(f"Deep analysis for {article.url} returned an unusable response, not storing it: {analysis_result.get('error')}")
+                return article
+            
+            try:
+                parsed_llm_data = get_parsed_analysis(analysis_result)
+                article.llm_deep_analysis_results = parsed_llm_data
+                logger.info(f"Deep LLM analysis successful for {article.url}. Stored in llm_deep_analysis_results.")
                 
-                try:
-                    parsed_llm_data = json.loads(raw_text_response)
-                    article.llm_deep_analysis_results = parsed_llm_data
-                    logger.info(f"Deep LLM analysis successful for {article.url}. Stored in llm_deep_analysis_results.")
-                    
-                    # Update the article in the database
-                    update_result = await collection.update_one(
-                        {"_id": ObjectId(article.id)},
-                        {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}}
-                    )
-                    if update_result.modified_count == 0 and update_result.matched_count > 0:
-                        logger.info(f"Deep analysis data for {article.url} was the same as existing data.")
-                    elif update_result.modified_count == 0:
-                        logger.warning(f"Failed to update article {article.url} with deep analysis results (no document matched).")
-                    else:
-                        logger.info(f"Article {article.url} updated successfully with deep analysis results.")
-                    return article # Return the updated article model
-
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse deep LLM response as JSON for {article.url}: {raw_text_response}")
-                    # Optionally store the raw error
-                    article.llm_deep_analysis_results = {"error": "JSONDecodeError", "raw_text": raw_text_response}
-                    await collection.update_one({"_id": ObjectId(article.id)}, {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}})
-                except Exception as e:
-                    logger.error(f"Error processing deep LLM JSON response for {article.url}: {e}", exc_info=True)
-                    article.llm_deep_analysis_results = {"error": str(e), "raw_text": raw_text_response}
-                    await collection.update_one({"_id": ObjectId(article.id)}, {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}})
-            elif analysis_result:
-                logger.warning(f"Deep LLM analysis for {article.url} did not return expected dict structure: {analysis_result}")
-                article.llm_deep_analysis_results = analysis_result
-                await collection.update_one({"_id": ObjectId(article.id)}, {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}})
-            else:
-                logger.warning(f"Deep LLM analysis returned no result for {article.url}")
-                return article # Return article as is, no analysis performed
+                # Update the article in the database
+                update_result = await collection.update_one(
+                    {"_id": article_oid},
+                    {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}}
+                )
+                if update_result.modified_count == 0 and update_result.matched_count > 0:
+                    logger.info(f"Deep analysis data for {article.url} was the same as existing data.")
+                elif update_result.modified_count == 0:
+                    logger.warning(f"Failed to update article {article.url} with deep analysis results (no document matched).")
+                else:
+                    logger.info(f"Article {article.url} updated successfully with deep analysis results.")
+                return article # Return the updated article model
+
+            except json.JSONDecodeError:
+                logger.error(f"Failed to parse deep LLM response as JSON for {article.url}: {raw_text_response}")
+                # Optionally store the raw error
+                article.llm_deep_analysis_results = {"error": "JSONDecodeError", "raw_text": raw_text_response}
+                await collection.update_one({"_id": article_oid}, {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}})
+            except Exception as e:
+                logger.error(f"Error processing deep LLM JSON response for {article.url}: {e}", exc_info=True)
+                article.llm_deep_analysis_results = {"error": str(e), "raw_text": raw_text_response}
+                await collection.update_one({"_id": article_oid}, {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}})
+        elif analysis_result:
+            logger.warning(f"Deep LLM analysis for {article.url} did not return expected dict structure: {analysis_result}")
+            article.llm_deep_analysis_results = analysis_result
+            await collection.update_one({"_id": article_oid}, {"$set": {"llm_deep_analysis_results": article.llm_deep_analysis_results}})
+        else:
+            logger.warning(f"Deep LLM analysis returned no result for {article.url}")
+            return article # Return article as is, no analysis performed
 
-        except Exception as e:
-            logger.error(f"Error during deep LLM analysis for article {article.url}: {e}", exc_info=True)
-            # Optionally store error in the article object if desired, even if it's not saved here
-            return article # Return article as is
-    else:
-        logger.info(f"LLM client not available. Skipping deep LLM analysis for article: {article.url}")
+    except Exception as e:
+        logger.error(f"Error during deep LLM analysis for article {article.url}: {e}", exc_info=True)
+        # Optionally store error in the article object if desired, even if it's not saved here
+        return article # Return article as is
     
-    return article # Return article, possibly unmodified if LLM client wasn't available
+    return article
 
 async def perform_deep_analysis_for_all_required(limit: int = 100) -> dict:
     """
     Batch process: Perform deep analysis for all articles flagged as requiring deep analysis,
     but which do not yet have deep analysis results.
     """
+    if not llm_service.client:
+        logger.info("LLM client not available. Skipping deep analysis batch.")
+        return {"processed": 0, "deep_analyzed": 0}
+
     collection = await get_article_collection()
     query = {
         "llm_requires_deep_analysis": True,
@@ -1062,6 +1082,22 @@ async def perform_deep_analysis_for_all_required(limit: int = 100) -> dict:
             updated += 1
     return {"processed": processed, "deep_analyzed": updated}
 
+async def run_triage_batch(articles: List[Article]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Runs triage for the articles through the LLM Batch API and waits for it to finish.
+    Returns the analysis results keyed by article id, or None if the batch could not be completed.
+    """
+    requests = [
+        (article.id, article.summary if article.summary else article.title, TRIAGE_PROMPT_TEMPLATE, TRIAGE_JSON_SCHEMA)
+        for article in articles
+        if article.summary or article.title
+    ]
+    batch_id = await llm_service.submit_batch(requests, temperature=0) # Same settings as individual triage requests
+    if not batch_id:
+        return None
+    logger.info(f"Waiting for triage batch {batch_id} with {len(requests)} articles")
+    return await llm_service.wait_for_batch(batch_id, json_schema=TRIAGE_JSON_SCHEMA)
+
 async def triage_new_articles(limit: int = 1000) -> Dict[str, int]:
     """
     Finds articles that haven't had initial triage analysis and performs it.
@@ -1069,31 +1105,50 @@ async def triage_new_articles(limit: int = 1000) -> Dict[str, int]:
     Identifies and links articles that refer to the same news story.
     Returns a count of analyzed, failed, and linked articles.
     """
+    if not llm_service.client:
+        logger.info("LLM client not available. Skipping triage analysis.")
+        return {"analyzed": 0, "failed": 0, "linked": 0}
+
     collection = await get_article_collection()
+    # Fetch the working set in a few large batches instead of Motor's default 101-doc batches
     unanalyzed_cursor = collection.find({
         "$or": [
             {"llm_category": {"$exists": False}},
             {"llm_category": None}
         ]
-    }).limit(limit)
-
-    analyzed_count = 0
-    failed_analysis_count = 0
-    linked_article_count = 0
+    }).limit(limit).batch_size(min(limit, 500))
+    article_docs = await unanalyzed_cursor.to_list(length=limit)
 
-    async for article_doc in unanalyzed_cursor: # Motor cursor is already async iterable
+    articles = []
+    for article_doc in article_docs:
         article_doc["id"] = str(article_doc["_id"])
-        # Fix llm_entities if it's a list of dicts (convert to list of strings)
-        if "llm_entities" in article_doc and isinstance(article_doc["llm_entities"], list):
-            if article_doc["llm_entities"] and isinstance(article_doc["llm_entities"][0], dict):
-                article_doc["llm_entities"] = [e.get("text", "") for e in article_doc["llm_entities"] if isinstance(e, dict) and "text" in e]
         # Add source_type if it's missing
         if "source_type" not in article_doc:
             article_doc["source_type"] = "db"  # Default source_type for articles from the database
-        article = Article(**article_doc)
+        articles.append(Article(**article_doc))
+
+    # Large runs are not interactive, so they can go through the cheaper Batch API
+    batch_results = None
+    if settings.LLM_USE_BATCH_API and len(articles) > settings.LLM_BATCH_MIN_ARTICLES:
+        batch_results = await run_triage_batch(articles)
+        if batch_results is None:
+            logger.warning("Triage batch did not complete, falling back to individual requests.")
+
+    analyzed_count = 0
+    failed_analysis_count = 0
+    linked_article_count = 0
+    # Relationship updates for the whole run, written in one bulk_write at the end
+    relationship_operations = []
+
+    logger.info(f"Performing triage analysis for {len(articles)} articles")
+    if batch_results is not None:
+        enriched_articles = [apply_triage_analysis(article, batch_results.get(article.id)) for article in articles]
+    else:
+        # Analyze concurrently; llm_service's request semaphore bounds the in-flight API calls, and
+        # identical texts (the same wire story from several feeds) share a single call
+        enriched_articles = await asyncio.gather(*(analyze_and_enrich_article(article) for article in articles))
 
-        logger.info(f"Performing triage analysis for article: {article.url}")
-        enriched_article = await analyze_and_enrich_article(article)
+    for article_doc, article, enriched_article in zip(article_docs, articles, enriched_articles):
 
         update_data = {}
         if enriched_article.llm_analysis_raw_response and not enriched_article.llm_analysis_raw_response.get("error"):
@@ -1102,6 +1157,7 @@ async def triage_new_articles(limit: int = 1000) -> Dict[str, int]:
                 "llm_category": enriched_article.llm_category,
                 "llm_sentiment": enriched_article.llm_sentiment,
                 "llm_key_claim": enriched_article.llm_key_claim,
+                "llm_key_claim_tokens": tokenize_key_claim(enriched_article.llm_key_claim or ""),
                 "llm_requires_deep_analysis": enriched_article.llm_requires_deep_analysis,
                 "llm_keywords": enriched_article.llm_keywords,
                 "llm_entities": enriched_article.llm_entities,
@@ -1119,16 +1175,16 @@ async def triage_new_articles(limit: int = 1000) -> Dict[str, int]:
                 
                 # Find and link related articles
                 logger.info(f"Finding related articles for: {article.url}")
-                related_ids = await find_and_link_related_articles(enriched_article)
+                related_ids, related_operations = await find_and_link_related_articles(enriched_article)
                 
                 if related_ids:
                     linked_article_count += len(related_ids)
                     logger.info(f"Found {len(related_ids)} related articles for {article.url}")
-                    # Update article with related ids
-                    await collection.update_one(
-                        {"_id": article_doc["_id"]},
-                        {"$set": {"related_article_ids": related_ids}}
+                    # $addToSet rather than $set so links added by other articles in the batch are kept
+                    relationship_operations.append(
+                        UpdateOne({"_id": article_doc["_id"]}, {"$addToSet": {"related_article_ids": {"$each": related_ids}}})
                     )
+                    relationship_operations.extend(related_operations)
             except Exception as e:
                 logger.error(f"Error finding related articles for {article.url}: {e}", exc_info=True)
                 
@@ -1150,28 +1206,89 @@ async def triage_new_articles(limit: int = 1000) -> Dict[str, int]:
                 logger.error(f"Error updating article {article.url} after triage: {e}", exc_info=True)
                 failed_analysis_count += 1 # Count as failed if DB update fails
 
+    if relationship_operations:
+        try:
+            await collection.bulk_write(relationship_operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Error saving related article links after triage: {e}", exc_info=True)
 
     logger.info(f"Triage analysis completed. Analyzed: {analyzed_count}, Failed: {failed_analysis_count}, Linked: {linked_article_count}")
     return {"analyzed": analyzed_count, "failed": failed_analysis_count, "linked": linked_article_count}
 
+# Ingest metadata that is refreshed when an article's content hash is unchanged, but only if it differs
+# from the stored value. fetched_date is left out: it is new on every fetch, so refreshing it would
+# rewrite every unchanged article.
+INGEST_METADATA_FIELDS = ("source_name", "source_type", "publication_date")
+
+def _comparable_value(value: Any) -> Any:
+    """Normalizes datetimes the way MongoDB stores them (UTC, millisecond precision, returned naive)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+def changed_ingest_metadata(article: Article, stored_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the ingest metadata fields of the article that differ from the stored document."""
+    changes = {}
+    for field in INGEST_METADATA_FIELDS:
+        value = getattr(article, field)
+        if value is not None and _comparable_value(value) != _comparable_value(stored_doc.get(field)):
+            changes[field] = value
+    return changes
+
+def compute_content_hash(article: Article) -> int:
+    """
+    Returns a 64-bit fingerprint of the article's large textual fields (title, summary, content).
+    Stored alongside the document so re-fetches of unchanged articles don't rewrite those fields.
+    """
+    payload = "\x00".join((article.title or "", article.summary or "", article.content or ""))
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True) # Signed so it fits in a BSON int64
+
 async def save_articles(articles: List[Article]) -> Dict[str, int]:
     """
     Saves a list of Article objects to the database without performing LLM analysis.
     Performs an upsert operation based on the article URL to avoid duplicates.
-    Returns a dictionary with counts of inserted and updated articles.
+    Articles whose stored content hash matches are counted as unchanged and are not rewritten;
+    only ingest metadata that differs from the stored document (e.g. a corrected date) is updated.
+    Returns a dictionary with counts of inserted, updated, unchanged and failed articles.
     """
     if not articles:
-        return {"inserted": 0, "updated": 0, "failed": 0}
+        return {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
 
     collection = await get_article_collection()
     operations = []
     processed_urls = set() # To handle potential duplicates within the input list
 
+    # Fetch the stored content hashes and ingest metadata for all incoming URLs in a single (url-indexed) query
+    existing_docs = {}
+    async for doc in collection.find(
+        {"url": {"$in": list({str(article.url) for article in articles})}},
+        {"url": 1, "content_hash": 1, **{field: 1 for field in INGEST_METADATA_FIELDS}, "_id": 0}
+    ):
+        existing_docs[doc["url"]] = doc
+    unchanged_count = 0
+    content_update_count = 0 # Existing articles whose content changed
+
     for article in articles: # Changed from enriched_articles to articles
-        if str(article.url) in processed_urls: # Ensure URL is string for set comparison
-            logger.warning(f"Duplicate URL in input list, skipping: {article.url}")
+        url_str = str(article.url) # HttpUrl rebuilds its string on every str() call, so do it once
+        if url_str in processed_urls:
+            logger.warning(f"Duplicate URL in input list, skipping: {url_str}")
             continue
-        processed_urls.add(str(article.url))
+        processed_urls.add(url_str)
+
+        content_hash = compute_content_hash(article)
+        existing_doc = existing_docs.get(url_str)
+        if existing_doc is not None and existing_doc.get("content_hash") == content_hash:
+            # Content is unchanged: write only the metadata fields that actually differ, if any
+            unchanged_count += 1
+            metadata_changes = changed_ingest_metadata(article, existing_doc)
+            if metadata_changes:
+                operations.append(UpdateOne({"url": url_str}, {"$set": metadata_changes}))
+            continue
+        if existing_doc is not None:
+            content_update_count += 1
 
         # Convert Pydantic model to dict, excluding 'id' if None, as MongoDB will generate _id
         # Pydantic v2: model_dump(), Pydantic v1: dict()
@@ -1180,18 +1297,17 @@ async def save_articles(articles: List[Article]) -> Dict[str, int]:
         except:
             article_dict = article.dict(exclude_none=True, exclude={'id'}) # Fallback for Pydantic v1
         
-        # Ensure HttpUrl is converted to string for MongoDB
-        if 'url' in article_dict and hasattr(article_dict['url'], 'unicode_string'): # Check if it's a PydanticUrl
-            article_dict['url'] = str(article_dict['url'])
-        elif 'url' in article_dict and not isinstance(article_dict['url'], str):
-             # Fallback for other URL-like objects, though HttpUrl is primary concern
-            article_dict['url'] = str(article_dict['url'])
+        # Ensure HttpUrl is stored as a string in MongoDB
+        article_dict['url'] = url_str
+        article_dict["content_hash"] = content_hash
+        # Pre-tokenized title so related-article scoring doesn't re-split titles on every lookup
+        article_dict["title_tokens"] = article.title_tokens
 
         # If article.id is provided and is a valid ObjectId string, you might want to use it as _id.
         # For now, we let MongoDB generate _id.
 
         op = UpdateOne(
-            {"url": str(article.url)},  # Filter by URL (ensure URL is string)
+            {"url": url_str},  # Filter by URL
             {
                 "$set": article_dict,
                 "$setOnInsert": {"first_seen_at": article.fetched_date} # Record when it was first added
@@ -1201,22 +1317,23 @@ async def save_articles(articles: List[Article]) -> Dict[str, int]:
         operations.append(op)
 
     if not operations:
-        return {"inserted": 0, "updated": 0, "failed": 0}
+        return {"inserted": 0, "updated": 0, "unchanged": unchanged_count, "failed": 0}
 
     try:
         result = await collection.bulk_write(operations, ordered=False)
         inserted_count = result.upserted_count
-        updated_count = result.modified_count
-        logger.info(f"Saved articles to DB. Inserted: {inserted_count}, Updated: {updated_count}")
-        return {"inserted": inserted_count, "updated": updated_count, "failed": 0}
+        updated_count = content_update_count # Metadata-only refreshes are counted as unchanged
+        logger.info(f"Saved articles to DB. Inserted: {inserted_count}, Updated: {updated_count}, Unchanged content: {unchanged_count}")
+        return {"inserted": inserted_count, "updated": updated_count, "unchanged": unchanged_count, "failed": 0}
     except Exception as e:
         logger.error(f"Error saving articles to DB: {e}", exc_info=True)
-        return {"inserted": 0, "updated": 0, "failed": len(operations)}
+        return {"inserted": 0, "updated": 0, "unchanged": 0, "failed": len(operations)}
 
-async def list_articles(skip: int = 0, limit: int = 20) -> List[Article]:
+async def list_articles(skip: int = 0, limit: int = 20) -> List[ArticleRead]:
     """
     Retrieves a paginated list of articles from the database,
     sorted by publication_date (descending), then fetched_date (descending).
+    Documents are returned as plain dicts; the API layer's response_model validates them.
     """
     collection = await get_article_collection()
     articles_from_db_cursor = collection.find().sort([
@@ -1224,21 +1341,16 @@ async def list_articles(skip: int = 0, limit: int = 20) -> List[Article]:
         ("fetched_date", DESCENDING)
     ]).skip(skip).limit(limit)
     
-    articles_from_db = []
-    async for doc in articles_from_db_cursor: # Motor cursor is async iterable
-        doc["id"] = str(doc["_id"]) # Map MongoDB's _id to Pydantic's id field
-        # Fix llm_entities if it's a list of dicts (convert to list of strings)
-        if "llm_entities" in doc and isinstance(doc["llm_entities"], list):
-            if doc["llm_entities"] and isinstance(doc["llm_entities"][0], dict):
-                doc["llm_entities"] = [e.get("text", "") for e in doc["llm_entities"] if isinstance(e, dict) and "text" in e]
-        # Ensure all fields are present or provide defaults if necessary before creating Article model
-        # This is important if new optional fields were added to the model but are not in older DB documents
-        articles_from_db.append(Article(**doc))
+    articles_from_db: List[ArticleRead] = []
+    # The page is capped by limit, so fetch it in one round-trip and iterate synchronously
+    for doc in await articles_from_db_cursor.to_list(length=limit):
+        doc["id"] = str(doc.pop("_id")) # Map MongoDB's _id to the id field
+        articles_from_db.append(doc)
 
     logger.info(f"Retrieved {len(articles_from_db)} articles from DB (skip={skip}, limit={limit})")
     return articles_from_db
 
-async def find_and_link_related_articles(article: Article) -> List[str]:
+async def find_and_link_related_articles(article: Article) -> Tuple[List[str], List[UpdateOne]]:
     """
     Finds articles that are related to the given article, focusing on articles covering the same news story.
     
@@ -1249,32 +1361,57 @@ async def find_and_link_related_articles(article: Article) -> List[str]:
     - Category match
     - Source diversity (to avoid just grouping articles from the same source)
     
-    Updates both the current article and related articles with bidirectional relationships.
-    Returns a list of ids of the related articles.
+    Returns the ids of the related articles together with the UpdateOne operations that add
+    this article to each related article's related_article_ids. The caller is expected to
+    batch those operations (with the ones for the current article) into a single bulk_write.
     """
     if not article.llm_keywords and not article.llm_entities and not article.title:
         logger.warning(f"Article {article.id} has insufficient metadata to find related articles")
-        return []
+        return [], []
+    
+    # Article-side inputs are cached on the model, so repeated lookups don't rebuild them
+    article_keywords = article.distinct_keywords
+    entity_texts = article.entity_texts
+    article_title_tokens = article.title_tokens
+    # Best score any candidate could reach: full keyword/entity overlap, same category,
+    # same day, title overlap and a new source. Skip the query when even that misses the threshold.
+    max_possible_score = (
+        2 * len(article_keywords)
+        + 3 * len(entity_texts)
+        + (1 if article.llm_category else 0)
+        + (2 if article.publication_date else 0)
+        + (2 if len(article_title_tokens) >= 3 else 0)
+        + 1
+    )
+    if max_possible_score < 5:
+        logger.info(f"Article {article.id} cannot reach the related-article threshold, skipping lookup")
+        return [], []
     
     collection = await get_article_collection()
-    query = {"_id": {"$ne": ObjectId(article.id)}}  # Exclude the current article using ObjectId
+    article_oid = ObjectId(article.id)
+    query = {"_id": {"$ne": article_oid}}  # Exclude the current article using ObjectId
     
     # Build the query based on available metadata
     conditions = []
     
     # Match by keywords if available (strong indicator of same story)
-    if article.llm_keywords:
-        # Need multiple matching keywords to indicate same story
-        keyword_condition = {"$expr": {"$gte": [{"$size": {"$setIntersection": ["$llm_keywords", article.llm_keywords]}}, 2]}}
-        conditions.append(keyword_condition)
+    # The $in prefilter lets the multikey index serve the branch; $expr then only checks
+    # the candidates it returns for the required overlap of at least 2
+    if article_keywords:
+        conditions.append({"$and": [
+            {"llm_keywords": {"$in": article_keywords}},
+            {"$expr": {"$gte": [{"$size": {"$setIntersection": [{"$ifNull": ["$llm_keywords", []]}, article_keywords]}}, 2]}}
+        ]})
     
     # Match by entities if available (e.g., same people, organizations, locations)
-    if article.llm_entities:
-        entity_texts = [entity["text"] for entity in article.llm_entities]
-        if entity_texts:
-            # Require multiple matching entities for same story
-            entity_condition = {"$expr": {"$gte": [{"$size": {"$setIntersection": [{"$map": {"input": "$llm_entities", "in": "$$this.text"}}, entity_texts]}}, 2]}}
-            conditions.append(entity_condition)
+    if entity_texts:
+        # Require multiple matching entities for same story
+        conditions.append({"$and": [
+            {"llm_entities.text": {"$in": entity_texts}},
+            {"$expr": {"$gte": [{"$size": {"$setIntersection": [
+                {"$map": {"input": {"$ifNull": ["$llm_entities", []]}, "in": "$$this.text"}}, entity_texts
+            ]}}, 2]}}
+        ]})
     
     # Match by category - same stories should be in the same category
     if article.llm_category:
@@ -1292,24 +1429,12 @@ async def find_and_link_related_articles(article: Article) -> List[str]:
         conditions.append(date_condition)
     
     # Match by key claim similarity - articles covering the same story often make similar key claims
-    if article.llm_key_claim:
-        # Skip text search which can cause complex query issues
-        # Instead, always use regex for key claim matching which is more compatible with other query operators
-        if len(article.llm_key_claim) > 5:  # Only use if key claim is substantial
-            # Extract significant words from key claim (avoid stop words)
-            words = article.llm_key_claim.lower().split()
-            stop_words = {"the", "a", "an", "and", "in", "on", "at", "to", "for", "with", "by", "of", "is", "are", "that", "this", "it", "as"}
-            significant_words = [word for word in words if word not in stop_words and len(word) > 3]
-            
-            # Use the most significant words (up to 3) for regex matching
-            if significant_words:
-                significant_terms = significant_words[:3]
-                regex_patterns = []
-                for term in significant_terms:
-                    # Escape special regex chars and create case-insensitive pattern
-                    regex_patterns.append({"llm_key_claim": {"$regex": re.escape(term), "$options": "i"}})
-                if regex_patterns:
-                    conditions.append({"$or": regex_patterns})
+    # Uses the key-claim tokens stored at triage, so the branch is an indexed multikey $in
+    if article.llm_key_claim and len(article.llm_key_claim) > 5:  # Only use if key claim is substantial
+        # Use the most significant words (up to 3)
+        significant_terms = tokenize_key_claim(article.llm_key_claim)[:3]
+        if significant_terms:
+            conditions.append({"llm_key_claim_tokens": {"$in": significant_terms}})
     
     # Combine conditions with OR to find potential matches
     if conditions:
@@ -1321,99 +1446,60 @@ async def find_and_link_related_articles(article: Article) -> List[str]:
     seen_sources = set([article.source_name]) if article.source_name else set()
     
     try:
-        # Check if the query might be too complex and simplify if needed
-        if len(query.get("$or", [])) > 3:
-            logger.info(f"Complex query detected for article {article.id}, simplifying to ensure execution")
-            # Keep only the most relevant conditions (keywords and category)
-            simplified_conditions = []
-            for condition in query.get("$or", []):
-                # Prioritize keeping keyword conditions as they're most relevant
-                if "$expr" in condition and "llm_keywords" in str(condition):
-                    simplified_conditions.append(condition)
-                # Keep category condition as it's simple and effective
-                elif "llm_category" in condition:
-                    simplified_conditions.append(condition)
-                    
-            # Ensure we have at least some conditions
-            if simplified_conditions:
-                query["$or"] = simplified_conditions[:3]  # Keep at most 3 conditions
-            else:
-                # If no good conditions found, fall back to just category and exclude current article
-                query = {"_id": {"$ne": ObjectId(article.id)}}
-                if article.llm_category:
-                    query["llm_category"] = article.llm_category
-        
-        cursor = collection.find(query, {
-            "_id": 1, 
-            "title": 1, 
-            "llm_keywords": 1, 
-            "llm_entities": 1, 
-            "llm_category": 1,
-            "publication_date": 1,
-            "source_name": 1,
-            "llm_key_claim": 1
-        })
-        
-        # For each potential match, calculate a similarity score
-        async for related_doc in cursor:
-            related_id = str(related_doc["_id"])
-            
+        # Score candidates server-side so only the best few documents cross the wire.
+        # Keyword/entity overlap, category, date proximity and title overlap are computed in
+        # the pipeline; the source-diversity bonus depends on which sources were already
+        # accepted, so it is applied below while walking the ranked results.
+        score_terms = []
+        if article_keywords:
+            score_terms.append({"$multiply": [2, {"$size": {"$setIntersection": [{"$ifNull": ["$llm_keywords", []]}, article_keywords]}}]})
+        if entity_texts:
+            score_terms.append({"$multiply": [3, {"$size": {"$setIntersection": [
+                {"$map": {"input": {"$ifNull": ["$llm_entities", []]}, "in": "$$this.text"}}, entity_texts
+            ]}}]})
+        if article.llm_category:
+            score_terms.append({"$cond": [{"$eq": ["$llm_category", article.llm_category]}, 1, 0]})
+        if article.publication_date:
+            # Documents without a publication_date fall through as "more than 2 days apart"
+            date_delta = {"$ifNull": [{"$abs": {"$subtract": ["$publication_date", article.publication_date]}}, 172800000]}
+            score_terms.append({"$cond": [{"$lt": [date_delta, 86400000]}, 2, {"$cond": [{"$lt": [date_delta, 172800000]}, 1, 0]}]})
+        if len(article_title_tokens) >= 3:  # Fewer tokens can never produce a 3-word overlap
+            # Simple text matching - count matching significant words.
+            # Uses the title_tokens stored at ingest; documents saved before that field existed
+            # fall back to splitting the title server-side
+            candidate_title_words = {"$ifNull": ["$title_tokens", {"$split": [{"$toLower": {"$ifNull": ["$title", ""]}}, " "]}]}
+            title_overlap = {"$size": {"$setIntersection": [candidate_title_words, article_title_tokens]}}
+            score_terms.append({"$cond": [{"$gte": [title_overlap, 3]}, 2, 0]})  # At least 3 significant words in common
+
+        pipeline = [
+            {"$match": query},  # First stage so the query can use indexes
+            {"$addFields": {"score": {"$add": score_terms or [0]}}},
+            # The source-diversity bonus adds at most 1, so anything below 4 can never reach the threshold
+            {"$match": {"score": {"$gte": 4}}},
+            {"$sort": {"score": DESCENDING}},
+            # At most 10 are kept, so a bounded pool of the best candidates is plenty and fits in one batch
+            {"$limit": RELATED_CANDIDATE_POOL_SIZE},
+            {"$project": {"_id": 1, "source_name": 1, "score": 1}}
+        ]
+
+        # The pool is small and capped, so materialize it in one call and rank it synchronously
+        candidates = await collection.aggregate(pipeline).to_list(length=RELATED_CANDIDATE_POOL_SIZE)
+        for related_doc in candidates:
             # Skip if we already have enough related articles
             if len(related_article_ids) >= 10:
                 break
-            
-            # Advanced scoring: consider multiple factors to determine if articles cover the same story
-            score = 0
-            
-            # Score for matching keywords
-            if article.llm_keywords and "llm_keywords" in related_doc:
-                related_keywords = related_doc.get("llm_keywords", [])
-                overlapping_keywords = set(article.llm_keywords) & set(related_keywords)
-                score += len(overlapping_keywords) * 2  # Weight keywords higher
-            
-            # Score for matching entities
-            if article.llm_entities and "llm_entities" in related_doc:
-                article_entity_texts = [entity["text"] for entity in article.llm_entities]
-                related_entity_texts = [entity["text"] for entity in related_doc.get("llm_entities", [])]
-                overlapping_entities = set(article_entity_texts) & set(related_entity_texts)
-                score += len(overlapping_entities) * 3  # Weight entities even higher
-            
-            # Score for category match
-            if article.llm_category and related_doc.get("llm_category") == article.llm_category:
-                score += 1
-            
-            # Score for publication date proximity
-            if article.publication_date and related_doc.get("publication_date"):
-                delta = abs((article.publication_date - related_doc["publication_date"]).total_seconds())
-                if delta < 86400:  # Same day
-                    score += 2
-                elif delta < 172800:  # Within 2 days
-                    score += 1
-            
+
+            score = related_doc["score"]
+
             # Source diversity bonus - prefer articles from different sources covering the same story
             source_name = related_doc.get("source_name")
             if source_name and source_name not in seen_sources:
                 score += 1
                 seen_sources.add(source_name)
-            
-            # Score for title similarity (basic version - could be enhanced with text similarity algorithms)
-            if article.title and "title" in related_doc:
-                # Simple text matching - count matching significant words
-                article_title_words = set(article.title.lower().split())
-                related_title_words = set(related_doc["title"].lower().split())
-                
-                # Remove common stop words that don't help identify topic similarity
-                stop_words = {"the", "a", "an", "and", "in", "on", "at", "to", "for", "with", "by", "of", "is", "are"}
-                article_title_words = article_title_words - stop_words
-                related_title_words = related_title_words - stop_words
-                
-                overlapping_words = article_title_words & related_title_words
-                if len(overlapping_words) >= 3:  # At least 3 significant words in common
-                    score += 2
-            
+
             # If the score meets our threshold, consider it related to the same news story
             if score >= 5:  # Higher threshold to ensure articles are about the same story
-                related_article_ids.append(related_id)
+                related_article_ids.append(str(related_doc["_id"]))
                 
                 # Create update operation to add current article ID to the related article's related_article_ids
                 update_operations.append(
@@ -1430,14 +1516,12 @@ async def find_and_link_related_articles(article: Article) -> List[str]:
             logger.info(f"Attempting fallback query for article {article.id}")
             
             # Very simple query - just match on category and exclude current article
-            simple_query = {"_id": {"$ne": ObjectId(article.id)}}
+            simple_query = {"_id": {"$ne": article_oid}}
             if article.llm_category:
                 simple_query["llm_category"] = article.llm_category
                 
                 # Try to find at least a few articles in the same category
-                cursor = collection.find(simple_query).limit(5)
-                
-                async for related_doc in cursor:
+                for related_doc in await collection.find(simple_query, {"_id": 1}).to_list(length=5):
                     related_id = str(related_doc["_id"])
                     related_article_ids.append(related_id)
                     
@@ -1454,15 +1538,7 @@ async def find_and_link_related_articles(article: Article) -> List[str]:
         except Exception as e:
             logger.error(f"Fallback query for article {article.id} also failed: {e}", exc_info=True)
     
-    # Update all related articles in a single bulk operation
-    if update_operations:
-        try:
-            result = await collection.bulk_write(update_operations)
-            logger.info(f"Updated {result.modified_count} articles with relationship to article {article.id}")
-        except Exception as e:
-            logger.error(f"Error updating related articles for {article.id}: {e}", exc_info=True)
-    
-    return related_article_ids
+    return related_article_ids, update_operations
 
 async def update_related_articles_for_existing(limit: int = 100, days_back: int = 30) -> Dict[str, int]:
     """
@@ -1491,44 +1567,55 @@ async def update_related_articles_for_existing(limit: int = 100, days_back: int
     }
     
     cursor = collection.find(query).sort("fetched_date", DESCENDING).limit(limit)
+    article_docs = await cursor.to_list(length=limit)
     
-    processed_count = 0
-    linked_article_count = 0
-    
-    async for article_doc in cursor:
+    # Each lookup only touches the database, so run them concurrently with a bounded fan-out
+    semaphore = asyncio.Semaphore(RELATED_ARTICLES_CONCURRENCY)
+
+    async def link_article(article_doc: Dict[str, Any]) -> Tuple[List[str], List[UpdateOne]]:
         article_doc["id"] = str(article_doc["_id"])
-        # Fix llm_entities if it's a list of dicts (convert to list of strings)
-        if "llm_entities" in article_doc and isinstance(article_doc["llm_entities"], list):
-            if article_doc["llm_entities"] and isinstance(article_doc["llm_entities"][0], dict):
-                article_doc["llm_entities"] = [e.get("text", "") for e in article_doc["llm_entities"] if isinstance(e, dict) and "text" in e]
         article = Article(**article_doc)
         
-        logger.info(f"Finding related articles for: {article.url}")
-        related_ids = await find_and_link_related_articles(article)
-        
+        async with semaphore:
+            logger.info(f"Finding related articles for: {article.url}")
+            return await find_and_link_related_articles(article)
+
+    results = await asyncio.gather(*(link_article(article_doc) for article_doc in article_docs))
+    
+    processed_count = len(article_docs)
+    linked_article_count = 0
+    update_operations = []
+    for article_doc, (related_ids, related_operations) in zip(article_docs, results):
         if related_ids:
             linked_article_count += len(related_ids)
-            logger.info(f"Found {len(related_ids)} related articles for {article.url}")
-            # Update article with related ids
-            await collection.update_one(
-                {"_id": article_doc["_id"]},
-                {"$set": {"related_article_ids": related_ids}}
+            logger.info(f"Found {len(related_ids)} related articles for {article_doc.get('url')}")
+            # $addToSet rather than $set so links added by other articles in the batch are kept
+            update_operations.append(
+                UpdateOne({"_id": article_doc["_id"]}, {"$addToSet": {"related_article_ids": {"$each": related_ids}}})
             )
-        
-        processed_count += 1
+            update_operations.extend(related_operations)
+    
+    if update_operations:
+        try:
+            # The updates are independent, so let the server apply them unordered
+            await collection.bulk_write(update_operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Error saving related article ids for existing articles: {e}", exc_info=True)
     
     logger.info(f"Update of existing articles completed. Processed: {processed_count}, Linked: {linked_article_count}")
     return {"processed": processed_count, "linked": linked_article_count}
 
-async def get_related_articles(article_id: str) -> List[Article]:
+async def get_related_articles_raw(article_id: str) -> List[ArticleRead]:
     """
-    Retrieves all articles that are related to the same news story as the given article.
+    Retrieves all articles that are related to the same news story as the given article,
+    as plain documents with _id mapped to id. Used by the API layer, whose response_model
+    validates the documents anyway.
     
     Args:
         article_id: The ID of the article to find related stories for
         
     Returns:
-        List of Article objects that cover the same news story
+        List of article documents that cover the same news story
     """
     collection = await get_article_collection()
     
@@ -1537,33 +1624,38 @@ async def get_related_articles(article_id: str) -> List[Article]:
         if not ObjectId.is_valid(article_id):
             logger.warning(f"Invalid article_id format: {article_id}")
             return []
-        article_doc = await collection.find_one({"_id": ObjectId(article_id)})
+        article_doc = await collection.find_one({"_id": ObjectId(article_id)}, {"related_article_ids": 1})
     except Exception as e:
         logger.error(f"Error fetching article {article_id} for related articles: {e}", exc_info=True)
         return []
     
     # If no related articles, return empty list
-    if not article_doc or "related_article_ids" not in article_doc or not article_doc["related_article_ids"]:
+    if not article_doc or not article_doc.get("related_article_ids"):
         logger.info(f"No related articles found for article_id: {article_id}")
         return []
     
     # Convert string IDs to ObjectIds for MongoDB query
-    related_article_object_ids = [ObjectId(related_id) for related_id in article_doc["related_article_ids"] if ObjectId.is_valid(related_id)]
+    related_article_object_ids = parse_object_ids(article_doc["related_article_ids"])
     
     # Get all related articles in a single query
-    if related_article_object_ids:
-        related_articles_cursor = collection.find({"_id": {"$in": related_article_object_ids}})
-        related_articles = []
-        async for doc in related_articles_cursor:
-            doc["id"] = str(doc["_id"])
-            # Fix llm_entities if it's a list of dicts (convert to list of strings)
-            if "llm_entities" in doc and isinstance(doc["llm_entities"], list):
-                if doc["llm_entities"] and isinstance(doc["llm_entities"][0], dict):
-                    doc["llm_entities"] = [e.get("text", "") for e in doc["llm_entities"] if isinstance(e, dict) and "text" in e]
-            related_articles.append(Article(**doc))
-        return related_articles
+    if not related_article_object_ids:
+        return []
+    related_articles = await collection.find({"_id": {"$in": related_article_object_ids}}).to_list(length=len(related_article_object_ids))
+    for doc in related_articles:
+        doc["id"] = str(doc.pop("_id"))
+    return related_articles
+
+async def get_related_articles(article_id: str) -> List[Article]:
+    """
+    Retrieves all articles that are related to the same news story as the given article.
     
-    return []
+    Args:
+        article_id: The ID of the article to find related stories for
+        
+    Returns:
+        List of Article objects that cover the same news story
+    """
+    return [Article(**doc) for doc in await get_related_articles_raw(article_id)]
 
 async def perform_comparative_analysis(article_ids: List[str]) -> Dict[str, Any]:
     """
@@ -1582,48 +1674,53 @@ async def perform_comparative_analysis(article_ids: List[str]) -> Dict[str, Any]
     
     # Get full article objects for all provided IDs
     collection = await get_article_collection()
-    object_ids = [ObjectId(aid) for aid in article_ids if ObjectId.is_valid(aid)]
+    object_ids = parse_object_ids(article_ids)
     
     if len(object_ids) < 2:
         logger.warning("Not enough valid article IDs for comparison")
         return {"error": "Not enough valid article IDs", "valid_ids": len(object_ids)}
     
-    # Retrieve all articles in a single query
-    articles = []
-    async for doc in collection.find({"_id": {"$in": object_ids}}):
-        doc["id"] = str(doc["_id"])
-        # Fix llm_entities if it's a list of dicts (convert to list of strings)
-        if "llm_entities" in doc and isinstance(doc["llm_entities"], list):
-            if doc["llm_entities"] and isinstance(doc["llm_entities"][0], dict):
-                doc["llm_entities"] = [e.get("text", "") for e in doc["llm_entities"] if isinstance(e, dict) and "text" in e]
-        articles.append(Article(**doc))
-    
-    if len(articles) < 2:
-        logger.warning(f"Could only retrieve {len(articles)} articles for comparative analysis")
-        return {"error": "Could not retrieve enough articles", "retrieved": len(articles)}
-    
-    logger.info(f"Performing comparative analysis on {len(articles)} articles")
-    
-    # Prepare article data for the LLM
+    # Retrieve all articles in a single query, projecting only what the prompt uses and
+    # truncating the body server-side (code points, so multi-byte characters are never split)
+    pipeline = [
+        {"$match": {"_id": {"$in": object_ids}}},
+        {"$project": {
+            "_id": 0,
+            "source_name": 1,
+            "title": 1,
+            "publication_date": 1,
+            # Use most complete content available for each article
+            "content": {"$substrCP": [{"$ifNull": ["$content", {"$ifNull": ["$summary", "$title"]}]}, 0, 2000]},  # Limit content length to avoid token limits
+            "llm_category": 1,
+            "llm_sentiment": 1,
+            "llm_key_claim": 1,
+            "llm_keywords": 1,
+            "llm_entities": 1,
+            "url": 1
+        }}
+    ]
     article_summaries = []
-    for article in articles:
-        # Use most complete content available for each article
-        content = article.content or article.summary or article.title
-        
+    async for doc in collection.aggregate(pipeline):
+        publication_date = doc.get("publication_date")
         # Prepare a summary of the article for the LLM to analyze
-        article_summary = {
-            "source_name": article.source_name,
-            "title": article.title,
-            "publication_date": article.publication_date.isoformat() if article.publication_date else None,
-            "content": content[:2000] if content else None,  # Limit content length to avoid token limits
-            "llm_category": article.llm_category,
-            "llm_sentiment": article.llm_sentiment,
-            "llm_key_claim": article.llm_key_claim,
-            "llm_keywords": article.llm_keywords,
-            "llm_entities": article.llm_entities,
-            "url": str(article.url)
-        }
-        article_summaries.append(article_summary)
+        article_summaries.append({
+            "source_name": doc.get("source_name"),
+            "title": doc.get("title"),
+            "publication_date": publication_date.isoformat() if publication_date else None,
+            "content": doc.get("content") or None,
+            "llm_category": doc.get("llm_category"),
+            "llm_sentiment": doc.get("llm_sentiment"),
+            "llm_key_claim": doc.get("llm_key_claim"),
+            "llm_keywords": doc.get("llm_keywords", []),
+            "llm_entities": normalize_entities(doc.get("llm_entities")),
+            "url": doc.get("url")
+        })
+    
+    if len(article_summaries) < 2:
+        logger.warning(f"Could only retrieve {len(article_summaries)} articles for comparative analysis")
+        return {"error": "Could not retrieve enough articles", "retrieved": len(article_summaries)}
+    
+    logger.info(f"Performing comparative analysis on {len(article_summaries)} articles")
     
     # Convert article summaries to JSON for the prompt
     articles_json = json.dumps(article_summaries, indent=2)
@@ -1636,14 +1733,18 @@ async def perform_comparative_analysis(article_ids: List[str]) -> Dict[str, Any]
                 prompt_template=COMPARATIVE_ANALYSIS_PROMPT_TEMPLATE,
                 model=settings.DEFAULT_LLM_MODEL_NAME,
                 max_tokens=2500,  # Comparative analysis needs more tokens
-                temperature=0.2,  # Lower temperature for more consistent analysis
+                temperature=0,  # Deterministic output, which also lets repeated comparisons use the LLM cache
                 json_schema=COMPARATIVE_ANALYSIS_JSON_SCHEMA
             )
             
+            if analysis_result and isinstance(analysis_result, dict) and analysis_result.get('error'):
+                # Not stored, so the articles are not linked to a failed analysis and can be compared again
+                logger.error(f"Comparative analysis returned an unusable response, not storing it: {analysis_result['error']}")
+                return {"error": "Invalid LLM response", "details": analysis_result['error']}
             if analysis_result and isinstance(analysis_result, dict) and 'analysis_text' in analysis_result:
                 # Parse the LLM response
                 try:
-                    comparative_analysis = json.loads(analysis_result['analysis_text'])
+                    comparative_analysis = get_parsed_analysis(analysis_result)
                     logger.info("Successfully performed comparative analysis")
                     
                     # Store the analysis in the database linked to these articles
@@ -1662,10 +1763,10 @@ async def perform_comparative_analysis(article_ids: List[str]) -> Dict[str, Any]
                     
                     # Update all involved articles with a reference to the comparative analysis
                     update_operations = []
-                    for aid in article_ids:
+                    for object_id in object_ids:
                         update_operations.append(
                             UpdateOne(
-                                {"_id": ObjectId(aid)},
+                                {"_id": object_id},
                                 {"$set": {"comparative_analysis_id": analysis_id}}
                             )
                         )
@@ -1677,7 +1778,7 @@ async def perform_comparative_analysis(article_ids: List[str]) -> Dict[str, Any]
                     
                     return {
                         "comparative_analysis": comparative_analysis, 
-                        "article_count": len(articles),
+                        "article_count": len(article_summaries),
                         "analysis_id": analysis_id
                     }
                     
@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """
+    Cache for raw LLM responses, keyed by a SHA-256 of the request (model, messages, tools, ...).
+
+    Entries live in an in-memory LRU with a TTL. When a path is given they are also persisted to
+    a SQLite file, so responses survive restarts and reruns; SQLite calls run in a worker thread.
+    Only deterministic requests (temperature 0) should be cached, which is up to the caller.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 7 * 24 * 3600, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db_initialized = False
+
+    @staticmethod
+    def make_key(request_params: Dict[str, Any]) -> str:
+        """Returns a stable SHA-256 hex digest for the given request parameters."""
+        payload = orjson.dumps(request_params, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.sha256(payload).hexdigest()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None and self.path:
+            entry = await asyncio.to_thread(self._db_get, key)
+        if entry is not None and time.time() - entry[0] < self.ttl_seconds:
+            self._remember(key, entry)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            self._entries.pop(key, None) # Expired
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        entry = (time.time(), value)
+        self._remember(key, entry)
+        if self.path:
+            try:
+                await asyncio.to_thread(self._db_set, key, entry)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist LLM cache entry to {self.path}: {e}")
+
+    def _remember(self, key: str, entry: Tuple[float, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False) # Evict the least recently used entry
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        if not self._db_initialized:
+            connection.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, created_at REAL, value TEXT)")
+            self._db_initialized = True
+        return connection
+
+    def _db_get(self, key: str) -> Optional[Tuple[float, str]]:
+        try:
+            with closing(self._connect()) as connection, connection:
+                row = connection.execute("SELECT created_at, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read LLM cache at {self.path}: {e}")
+            return None
+        return (row[0], row[1]) if row else None
+
+    def _db_set(self, key: str, entry: Tuple[float, str]) -> None:
+        with closing(self._connect()) as connection, connection: # Close the connection and commit the write
+            connection.execute("INSERT OR REPLACE INTO llm_cache (key, created_at, value) VALUES (?, ?, ?)", (key, *entry))
@@ -1,13 +1,26 @@
+import asyncio
 import logging
 import json
-from typing import Dict, Any, Optional
-import re  # Add import for regular expressions
+import fastjsonschema
+import httpx
+import orjson
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import re
 
-from openai import OpenAI, OpenAIError
+from openai import AsyncOpenAI, OpenAIError
 from config.settings import settings
+from app.services.llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
+# Kept byte-identical across calls so providers can reuse the cached prompt prefix
+SYSTEM_PROMPT = "You are an AI assistant performing detailed content analysis. Respond with a valid JSON object based on the user's instructions."
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# Shared decoder; raw_decode runs in the C scanner and reports where the first complete value ends
+_JSON_DECODER = json.JSONDecoder()
+
 def repair_incomplete_json(possibly_incomplete_json: str) -> str:
     """
     Attempts to repair or truncate incomplete JSON to make it valid.
@@ -18,61 +31,65 @@ def repair_incomplete_json(possibly_incomplete_json: str) -> str:
     Returns:
         A valid JSON string or None if repair isn't possible
     """
-    # First check if it's already valid
-    try:
-        json.loads(possibly_incomplete_json)
-        return possibly_incomplete_json  # It's already valid
-    except json.JSONDecodeError:
-        pass  # Continue with repair attempts
-    
-    # Try to find the last complete JSON object by looking for balanced braces
-    # This is a simplified approach and may not work for all cases
     incomplete_json = possibly_incomplete_json.strip()
     
     # Only attempt repair for objects starting with {
     if not incomplete_json.startswith('{'):
         logger.warning(f"Cannot repair JSON that doesn't start with '{{': {incomplete_json[:50]}...")
         return None
-        
-    # Count opening and closing braces
-    depth = 0
-    in_string = False
-    escaped = False
-    valid_until = 0
-    
-    for i, char in enumerate(incomplete_json):
-        if in_string:
-            if char == '\\' and not escaped:
-                escaped = True
-                continue
-            elif char == '"' and not escaped:
-                in_string = False
-            escaped = False
-        elif char == '"':
-            in_string = True
-        elif char == '{':
-            depth += 1
-        elif char == '}':
-            depth -= 1
-            # If we've closed all braces, this could be a valid JSON endpoint
-            if depth == 0:
-                valid_until = i + 1
     
-    # If we found a potential valid JSON substring
-    if valid_until > 0:
-        truncated_json = incomplete_json[:valid_until]
-        try:
-            # Verify it's actually valid
-            json.loads(truncated_json)
-            logger.info(f"Successfully repaired incomplete JSON by truncating at position {valid_until}")
-            return truncated_json
-        except json.JSONDecodeError:
-            pass  # The truncated version still isn't valid
+    # Keep the first complete top-level object and drop anything trailing it
+    try:
+        _, valid_until = _JSON_DECODER.raw_decode(incomplete_json)
+    except json.JSONDecodeError:
+        # The object itself is truncated, so there is no complete prefix to keep
+        logger.warning(f"Could not repair incomplete JSON: {incomplete_json[:50]}...")
+        return None
     
-    # If we reach here, simple truncation didn't work
-    logger.warning(f"Could not repair incomplete JSON: {incomplete_json[:50]}...")
-    return None
+    if valid_until < len(incomplete_json):
+        logger.info(f"Successfully repaired incomplete JSON by truncating at position {valid_until}")
+    return incomplete_json[:valid_until]
+
+# The only characters that change the tracker's state: an escape (with the character it escapes), quotes and braces.
+# finditer jumps between them in C instead of stepping through every character in Python.
+_JSON_STRUCTURE_TOKEN = re.compile(r'\\.?|["{}]', re.DOTALL)
+
+class JsonObjectTracker:
+    """
+    Follows brace depth over streamed text, skipping braces inside strings, to tell when the first
+    top-level JSON object is complete without re-parsing everything received so far.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
 
+    def feed(self, text: str) -> int:
+        """Consumes the next chunk. Returns the index just past the object's closing brace if it is in this chunk, else -1."""
+        start = 0
+        if self.escaped: # The previous chunk ended with a backslash, so the first character here is escaped
+            self.escaped = False
+            start = 1
+        for match in _JSON_STRUCTURE_TOKEN.finditer(text, start):
+            token = match.group()
+            if token[0] == '\\':
+                self.escaped = len(token) == 1 # A trailing backslash escapes the start of the next chunk
+            elif token == '"':
+                self.in_string = not self.in_string and self.started
+            elif self.in_string:
+                continue
+            elif token == '{':
+                self.depth += 1
+                self.started = True
+            elif self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return match.end()
+        return -1
+
+@lru_cache(maxsize=32)
 def escape_curly_braces_except_content(template: str) -> str:
     """
     Escapes all curly braces in the template except for the {content} placeholder.
@@ -85,31 +102,337 @@ def escape_curly_braces_except_content(template: str) -> str:
     escaped = escaped.replace('{{content}}', '{content}')
     return escaped
 
+@lru_cache(maxsize=32)
+def split_prompt_template(template: str) -> Tuple[str, ...]:
+    """
+    Splits the template around its {content} placeholders, once per distinct template.
+    Joining the parts with the content gives the same result as escaping every other brace
+    and calling .format(content=...), without re-scanning the template on each call.
+    """
+    return tuple(template.split("{content}"))
+
+# Schemas are static module-level dicts, so their token budget is computed once per schema object.
+# The schema itself is kept in the entry so its id cannot be reused by another object.
+_schema_token_budgets: Dict[int, Tuple[Dict[str, Any], int]] = {}
+
+def schema_token_budget(json_schema: Dict[str, Any]) -> int:
+    """Returns the max_tokens needed for a response to the schema, scaled by schema size within [1000, 4000]."""
+    entry = _schema_token_budgets.get(id(json_schema))
+    if entry is None or entry[0] is not json_schema:
+        schema_complexity = len(orjson.dumps(json_schema))
+        entry = (json_schema, max(1000, min(4000, schema_complexity * 3)))
+        _schema_token_budgets[id(json_schema)] = entry
+    return entry[1]
+
+# Tool definitions, cached the same way as the token budgets. They are shared between requests and must not be mutated.
+_schema_tools: Dict[int, Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]] = {}
+
+def get_schema_tools(json_schema: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Returns the (tools, tool_choice) request parameters that force a response following the schema."""
+    entry = _schema_tools.get(id(json_schema))
+    if entry is None or entry[0] is not json_schema:
+        # Define a function that will return data conforming to our schema
+        function_def = {
+            "name": "format_article_analysis",
+            "description": "Format the analysis of an article according to the specified schema",
+            "parameters": json_schema
+        }
+        tools = [{"type": "function", "function": function_def}]
+        tool_choice = {"type": "function", "function": {"name": "format_article_analysis"}}
+        entry = (json_schema, tools, tool_choice)
+        _schema_tools[id(json_schema)] = entry
+    return entry[1], entry[2]
+
+# Compiled validators, cached the same way as the token budgets
+_schema_validators: Dict[int, Tuple[Dict[str, Any], Optional[Callable[[Any], Any]]]] = {}
+
+def get_schema_validator(json_schema: Dict[str, Any]) -> Optional[Callable[[Any], Any]]:
+    """Returns a compiled validator for the schema, or None if the schema cannot be compiled."""
+    entry = _schema_validators.get(id(json_schema))
+    if entry is None or entry[0] is not json_schema:
+        try:
+            validator = fastjsonschema.compile(json_schema)
+        except fastjsonschema.JsonSchemaDefinitionException as e:
+            logger.warning(f"Could not compile JSON schema, responses will not be validated against it: {e}")
+            validator = None
+        entry = (json_schema, validator)
+        _schema_validators[id(json_schema)] = entry
+    return entry[1]
+
+# One client per (api_key, base_url), so every LLMService shares its HTTP connection pool
+_clients: Dict[Tuple[str, Optional[str]], AsyncOpenAI] = {}
+# Bumped by close_clients(), so LLMService instances drop the closed clients they hold
+_clients_generation = 0
+
+def _get_client(api_key: str, base_url: Optional[str]) -> AsyncOpenAI:
+    client = _clients.get((api_key, base_url))
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=2,
+            timeout=60.0,
+            http_client=httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=max(100, settings.LLM_MAX_CONCURRENT_REQUESTS),
+                max_keepalive_connections=50
+            ))
+        )
+        _clients[(api_key, base_url)] = client
+    return client
+
+async def close_clients() -> None:
+    """
+    Closes the shared OpenAI clients and their connection pools.
+    Existing LLMService instances get a new client on their next use (e.g. after an app restart).
+    """
+    global _clients_generation
+    _clients_generation += 1
+    while _clients:
+        _, client = _clients.popitem()
+        await client.close()
+
 class LLMService:
     def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         self.api_key = api_key or settings.OPENAI_API_KEY
         
-        # Fix for escaped URL characters
-        base_url_from_settings = settings.OPENAI_BASE_URL
-        if base_url_from_settings and '\\x3a' in base_url_from_settings:
-            # Replace escaped colon with actual colon
-            base_url_from_settings = base_url_from_settings.replace('\\x3a', ':')
-            logger.info(f"Fixed escaped characters in base URL: {base_url_from_settings}")
-            
-        self.base_url = base_url or base_url_from_settings
+        self.base_url = base_url or settings.OPENAI_BASE_URL
         
         logger.debug(f"Initializing LLMService with base_url: {self.base_url}")
         
+        # Caps in-flight requests so concurrent callers stay below the provider's rate limits
+        self.request_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENT_REQUESTS)
+        # Requests currently waiting on the API, keyed by their LLMCache key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Cache for deterministic (temperature 0) responses
+        self.cache = LLMCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            path=settings.LLM_CACHE_PATH
+        ) if settings.LLM_CACHE_ENABLED else None
+        
+        self._client: Optional[AsyncOpenAI] = None
+        self._client_generation = -1
         if not self.api_key:
             logger.warning("OpenAI API key is not configured. LLM functionalities will be disabled.")
-            self.client = None
+        elif self.client:
+            logger.info(f"LLMService initialized. Using API base: {self.client.base_url}")
+
+    @property
+    def client(self) -> Optional[AsyncOpenAI]:
+        """The shared client for this service's configuration, re-resolved after close_clients()."""
+        if self._client_generation != _clients_generation:
+            self._client_generation = _clients_generation
+            self._client = None
+            if self.api_key:
+                try:
+                    self._client = _get_client(self.api_key, self.base_url)
+                except Exception as e:
+                    logger.error(f"Failed to initialize OpenAI client: {e}", exc_info=True)
+        return self._client
+
+    @client.setter
+    def client(self, client: Optional[AsyncOpenAI]) -> None:
+        self._client = client
+        self._client_generation = _clients_generation
+
+    def _extract_analysis_text(self, response: Any, json_schema: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Pulls the analysis text out of a chat completion, from the tool call or the message content."""
+        # Initialize analysis_text to None
+        analysis_text = None
+        
+        # Check if we got a valid response object
+        if response is None or not hasattr(response, 'choices') or not response.choices:
+            logger.warning("LLM returned an invalid or empty response structure")
+        # Process the response based on whether we used tools API or simple response_format
+        elif json_schema and hasattr(response.choices[0].message, 'tool_calls') and response.choices[0].message.tool_calls:
+            # Extract the function call result from tools API
+            tool_call = response.choices[0].message.tool_calls[0]
+            analysis_text = tool_call.function.arguments
+            logger.info(f"LLM analysis via JSON schema tool: '{analysis_text}'")
+            # Validity is checked once in _to_analysis_result, which can also repair truncated JSON
+        else:
+            # Extract standard response
+            if hasattr(response.choices[0].message, 'content'):
+                analysis_text = response.choices[0].message.content
+                logger.info(f"LLM analysis raw response: '{analysis_text}'")
+            else:
+                logger.warning("Response message missing expected 'content' field")
+        
+        return analysis_text
+
+    def _build_request_params(
+        self,
+        content: str,
+        prompt_template: str,
+        max_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Builds the chat completion request for the content, or returns None if the template is unusable."""
+        # Ensure prompt_template is a string and contains {content}
+        if not isinstance(prompt_template, str) or "{content}" not in prompt_template:
+            logger.error("Prompt template must be a string and include a '{content}' placeholder.")
+            return None
+        if not prompt_template.rstrip().endswith("{content}"):
+            # Static instructions before the content form a shared prefix that providers can cache
+            logger.warning("Prompt template does not end with '{content}'; provider prompt caching will be less effective.")
+
+        # Substitute {content}; every other brace in the template is kept literally
+        formatted_prompt = content.join(split_prompt_template(prompt_template))
+        
+        # Determine the model to use
+        # If a model is passed directly to this function, use it.
+        # Otherwise, fall back to the default model from settings.
+        target_model = settings.DEFAULT_LLM_MODEL_NAME
+
+        logger.debug(f"Sending request to LLM. Model: {target_model}, Prompt: {formatted_prompt[:200]}...") # Log snippet
+        
+        # Prepare the messages for the LLM
+        messages = [
+            SYSTEM_MESSAGE,
+            {"role": "user", "content": formatted_prompt}
+        ]
+        
+        # Prepare the request parameters
+        request_params = {
+            "model": target_model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        
+        # Add response_format based on the parameters
+        if json_schema:
+            # Use the tools/function calling API with JSON schema for more control
+            logger.debug(f"Using JSON schema for response formatting: {json_schema}")
+            
+            # Configure the request to use the function calling API
+            # This forces the LLM to return data that conforms to our schema
+            request_params["tools"], request_params["tool_choice"] = get_schema_tools(json_schema)
+            
+            # Add max_tokens parameter if not already set to ensure we get complete responses
+            if "max_tokens" not in request_params or request_params["max_tokens"] < 1000:
+                # Ensure we have enough tokens for a complete response based on the schema complexity
+                request_params["max_tokens"] = schema_token_budget(json_schema)
+                logger.debug(f"Adjusted max_tokens to {request_params['max_tokens']} based on schema complexity")
+            
+            logger.debug("Using function calling API for structured JSON output")
         else:
+            # Use the simpler response_format for basic JSON responses
+            request_params["response_format"] = {"type": "json_object"}
+            logger.debug("Using standard JSON response format")
+        
+        return request_params
+
+    def _to_analysis_result(self, analysis_text: Optional[str], json_schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Wraps the LLM output in the analysis result dict, substituting a default or repaired JSON when needed.
+        When the JSON was parsed here, the parsed object is included as "parsed" so callers need not parse it again.
+        When a default was substituted, the reason is also set as "error", so callers can avoid persisting it.
+        """
+        # Log the length if we have a response
+        if analysis_text:
+            logger.info(f"LLM analysis received successfully. Length: {len(analysis_text)}")
+        
+        # If the response is empty or None, create a default JSON string
+        if not analysis_text or analysis_text.strip() == "":
+            logger.warning("LLM returned an empty response, providing default JSON")
+            default_analysis = {
+                "category": "Uncategorized",
+                "sentiment": "Neutral",
+                "key_claim": "No key claim detected",
+                "requires_deep_analysis": "no",
+                "keywords": [],
+                "main_entities": [],
+                "error": "Empty LLM response"
+            }
+            return {"analysis_text": orjson.dumps(default_analysis).decode(), "parsed": default_analysis, "error": default_analysis["error"]}
+        
+        # Validate JSON before returning it
+        if json_schema:
+            validator = get_schema_validator(json_schema)
             try:
-                self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
-                logger.info(f"LLMService initialized. Using API base: {self.client.base_url}")
-            except Exception as e:
-                logger.error(f"Failed to initialize OpenAI client: {e}", exc_info=True)
-                self.client = None
+                # Try to parse the JSON to ensure it's valid and complete
+                try:
+                    parsed_json = orjson.loads(analysis_text)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Received potentially incomplete JSON: {e}")
+                    
+                    # Try to repair the JSON
+                    repaired_json = repair_incomplete_json(analysis_text)
+                    if not repaired_json:
+                        raise
+                    parsed_json = orjson.loads(repaired_json)
+                    analysis_text = repaired_json
+                    logger.info("Successfully repaired incomplete JSON response")
+                
+                # Check that the response actually follows the schema, not just that it is JSON
+                if validator:
+                    validator(parsed_json)
+                return {"analysis_text": analysis_text, "parsed": parsed_json}
+            except json.JSONDecodeError as e:
+                # If repair failed, return a default response
+                logger.error(f"Invalid JSON in LLM response and repair failed: {e}")
+                error = f"Invalid JSON response: {str(e)}"
+            except fastjsonschema.JsonSchemaValueException as e:
+                logger.error(f"LLM response does not match the JSON schema: {e.message}")
+                error = f"Schema validation failed: {e.message}"
+            
+            default_analysis = {
+                "category": "Uncategorized",
+                "sentiment": "Neutral",
+                "key_claim": "JSON parsing error",
+                "requires_deep_analysis": "no",
+                "keywords": [],
+                "main_entities": [],
+                "error": error
+            }
+            return {"analysis_text": orjson.dumps(default_analysis).decode(), "parsed": default_analysis, "error": error}
+        
+        # Return the normal response if we have content
+        return {"analysis_text": analysis_text}
+
+    async def _request_analysis_text(self, request_params: Dict[str, Any], json_schema: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Makes the API call, within the concurrency limit, and returns the raw analysis text."""
+        # Make the API call without blocking the event loop
+        async with self.request_semaphore:
+            if settings.LLM_STREAM_RESPONSES:
+                return await self._stream_analysis_text(request_params, json_schema)
+            response = await self.client.chat.completions.create(**request_params)
+            return self._extract_analysis_text(response, json_schema)
+
+    async def _stream_analysis_text(self, request_params: Dict[str, Any], json_schema: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        Streams the completion and stops reading as soon as a complete top-level JSON object has arrived,
+        instead of waiting for the model to finish or run out of tokens.
+        """
+        stream = await self.client.chat.completions.create(**request_params, stream=True)
+        tracker = JsonObjectTracker()
+        parts = []
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                # With a schema the object arrives as tool call arguments, otherwise as message content
+                if json_schema and delta.tool_calls and delta.tool_calls[0].function:
+                    piece = delta.tool_calls[0].function.arguments
+                else:
+                    piece = delta.content
+                if not piece:
+                    continue
+                end = tracker.feed(piece)
+                if end != -1:
+                    parts.append(piece[:end])
+                    break
+                parts.append(piece)
+        finally:
+            await stream.close() # Also stops generation when we break early
+
+        analysis_text = "".join(parts)
+        logger.info(f"LLM analysis streamed response: '{analysis_text}'")
+        return analysis_text or None
 
     async def analyze_content(
         self, 
@@ -133,160 +456,42 @@ class LLMService:
 
         Returns:
             A dictionary containing the structured analysis from the LLM, or None if an error occurs.
+            "analysis_text" holds the raw JSON text and, for schema requests, "parsed" holds the parsed object.
         """
         if not self.client:
             logger.error("LLM client not initialized. Cannot analyze content.")
             return None
-        
-        # Ensure prompt_template is a string and contains {content}
-        if not isinstance(prompt_template, str) or "{content}" not in prompt_template:
-            logger.error("Prompt template must be a string and include a '{content}' placeholder.")
-            return None
-
-        # Escape curly braces except for {content}
-        prompt_template = escape_curly_braces_except_content(prompt_template)
-
-        try:
-            formatted_prompt = prompt_template.format(content=content)
-        except KeyError as e:
-            logger.error(f"Error formatting prompt template: {e}. This likely means the template contains unescaped curly braces that look like placeholders. Double curly braces {{{{ }}}} should be used for literal braces in template.")
-            return {"analysis_text": "", "error": f"Prompt template formatting error: {str(e)}"}
-        except Exception as e:
-            logger.error(f"Error formatting prompt template: {e}", exc_info=True)
-            return {"analysis_text": "", "error": f"Prompt template error: {str(e)}"}
-        
-        # Determine the model to use
-        # If a model is passed directly to this function, use it.
-        # Otherwise, fall back to the default model from settings.
-        target_model = settings.DEFAULT_LLM_MODEL_NAME
 
         try:
-            logger.debug(f"Sending request to LLM. Model: {target_model}, Prompt: {formatted_prompt[:200]}...") # Log snippet
-            
-            # Prepare the messages for the LLM
-            messages = [
-                {"role": "system", "content": "You are an AI assistant performing detailed content analysis. Respond with a valid JSON object based on the user's instructions."},
-                {"role": "user", "content": formatted_prompt}
-            ]
-            
-            # Prepare the request parameters
-            request_params = {
-                "model": target_model,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-            }
-            
-            # Add response_format based on the parameters
-            if json_schema:
-                # Use the tools/function calling API with JSON schema for more control
-                logger.debug(f"Using JSON schema for response formatting: {json_schema}")
-                
-                # Define a function that will return data conforming to our schema
-                function_def = {
-                    "name": "format_article_analysis",
-                    "description": "Format the analysis of an article according to the specified schema",
-                    "parameters": json_schema
-                }
-                
-                # Configure the request to use the function calling API
-                # This forces the LLM to return data that conforms to our schema
-                request_params["tools"] = [{"type": "function", "function": function_def}]
-                request_params["tool_choice"] = {"type": "function", "function": {"name": "format_article_analysis"}}
-                
-                # Add max_tokens parameter if not already set to ensure we get complete responses
-                if "max_tokens" not in request_params or request_params["max_tokens"] < 1000:
-                    # Ensure we have enough tokens for a complete response based on the schema complexity
-                    schema_complexity = len(json.dumps(json_schema))
-                    # Scale tokens based on schema size with a minimum of 1000
-                    request_params["max_tokens"] = max(1000, min(4000, schema_complexity * 3))
-                    logger.debug(f"Adjusted max_tokens to {request_params['max_tokens']} based on schema complexity")
-                
-                logger.debug("Using function calling API for structured JSON output")
-            else:
-                # Use the simpler response_format for basic JSON responses
-                request_params["response_format"] = {"type": "json_object"}
-                logger.debug("Using standard JSON response format")
+            request_params = self._build_request_params(content, prompt_template, max_tokens, temperature, json_schema)
+            if request_params is None:
+                return None
                 
-            # Make the API call
-            response = self.client.chat.completions.create(**request_params)
+            request_key = LLMCache.make_key(request_params)
+            # Identical requests at temperature 0 are deterministic, so their responses can be reused
+            cache_key = request_key if self.cache and temperature == 0 else None
+            analysis_text = await self.cache.get(cache_key) if cache_key else None
             
-            # Initialize analysis_text to None
-            analysis_text = None
-            
-            # Check if we got a valid response object
-            if response is None or not hasattr(response, 'choices') or not response.choices:
-                logger.warning("LLM returned an invalid or empty response structure")
-            # Process the response based on whether we used tools API or simple response_format
-            elif json_schema and hasattr(response.choices[0].message, 'tool_calls') and response.choices[0].message.tool_calls:
-                # Extract the function call result from tools API
-                tool_call = response.choices[0].message.tool_calls[0]
-                analysis_text = tool_call.function.arguments
-                logger.info(f"LLM analysis via JSON schema tool: '{analysis_text}'")
-                
-                # Check if the returned JSON is complete and valid
-                try:
-                    json.loads(analysis_text)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Received truncated or invalid JSON from LLM: {e}")
-                    analysis_text = None  # Reset to trigger the default response below
+            if analysis_text is not None:
+                logger.debug(f"LLM cache hit for model {request_params['model']}")
             else:
-                # Extract standard response
-                if hasattr(response.choices[0].message, 'content'):
-                    analysis_text = response.choices[0].message.content
-                    logger.info(f"LLM analysis raw response: '{analysis_text}'")
+                # Concurrent identical requests (e.g. the same wire story from several feeds) share one API call
+                inflight = self._inflight.get(request_key)
+                if inflight is None:
+                    inflight = asyncio.ensure_future(self._request_analysis_text(request_params, json_schema))
+                    self._inflight[request_key] = inflight
+                    inflight.add_done_callback(lambda _: self._inflight.pop(request_key, None))
                 else:
-                    logger.warning("Response message missing expected 'content' field")
-            
-            # Log the length if we have a response
-            if analysis_text:
-                logger.info(f"LLM analysis received successfully. Length: {len(analysis_text)}")
+                    logger.debug(f"Joining in-flight LLM request for model {request_params['model']}")
+                # Shielded so a cancelled caller does not cancel the request for the others
+                analysis_text = await asyncio.shield(inflight)
+                result = self._to_analysis_result(analysis_text, json_schema)
+                # Only usable responses are cached, so a failed analysis is retried rather than replayed
+                if cache_key and analysis_text and not result.get("error"):
+                    await self.cache.set(cache_key, analysis_text)
+                return result
             
-            # If the response is empty or None, create a default JSON string
-            if not analysis_text or analysis_text.strip() == "":
-                logger.warning("LLM returned an empty response, providing default JSON")
-                default_json = json.dumps({
-                    "category": "Uncategorized",
-                    "sentiment": "Neutral",
-                    "key_claim": "No key claim detected",
-                    "requires_deep_analysis": "no",
-                    "keywords": [],
-                    "main_entities": [],
-                    "error": "Empty LLM response"
-                })
-                return {"analysis_text": default_json}
-            
-            # Validate JSON before returning it
-            if json_schema:
-                try:
-                    # Try to parse the JSON to ensure it's valid and complete
-                    parsed_json = json.loads(analysis_text)
-                    # Return the validated JSON
-                    return {"analysis_text": analysis_text}
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Received potentially incomplete JSON: {e}")
-                    
-                    # Try to repair the JSON
-                    repaired_json = repair_incomplete_json(analysis_text)
-                    if repaired_json:
-                        logger.info("Successfully repaired incomplete JSON response")
-                        return {"analysis_text": repaired_json}
-                    
-                    # If repair failed, return a default response
-                    logger.error(f"Invalid JSON in LLM response and repair failed: {e}")
-                    default_json = json.dumps({
-                        "category": "Uncategorized",
-                        "sentiment": "Neutral",
-                        "key_claim": "JSON parsing error",
-                        "requires_deep_analysis": "no",
-                        "keywords": [],
-                        "main_entities": [],
-                        "error": f"Invalid JSON response: {str(e)}"
-                    })
-                    return {"analysis_text": default_json}
-            
-            # Return the normal response if we have content
-            return {"analysis_text": analysis_text}
+            return self._to_analysis_result(analysis_text, json_schema)
 
         except OpenAIError as e:
             logger.error(f"OpenAI API error during content analysis: {e}", exc_info=True)
@@ -303,6 +508,97 @@ class LLMService:
             logger.error(f"Unexpected error during content analysis: {e}", exc_info=True)
             return {"analysis_text": "", "error": f"Unexpected error: {str(e)}"}
 
+    async def submit_batch(
+        self,
+        requests: List[Tuple[str, str, str, Optional[Dict[str, Any]]]],
+        max_tokens: int = 5000,
+        temperature: float = 0.3
+    ) -> Optional[str]:
+        """
+        Submits (custom_id, content, prompt_template, json_schema) requests through the Batch API.
+        Batched requests are billed at a lower rate and have their own rate limits, but complete
+        asynchronously within 24 hours. Returns the batch id, or None if nothing was submitted.
+        """
+        if not self.client:
+            logger.error("LLM client not initialized. Cannot submit batch.")
+            return None
+
+        lines = []
+        for custom_id, content, prompt_template, json_schema in requests:
+            request_params = self._build_request_params(content, prompt_template, max_tokens, temperature, json_schema)
+            if request_params is None:
+                continue
+            lines.append(orjson.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": request_params
+            }))
+        if not lines:
+            return None
+
+        try:
+            batch_file = await self.client.files.create(file=("batch_requests.jsonl", b"\n".join(lines)), purpose="batch")
+            batch = await self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+        except OpenAIError as e:
+            logger.error(f"OpenAI API error while submitting batch: {e}", exc_info=True)
+            return None
+
+        logger.info(f"Submitted LLM batch {batch.id} with {len(lines)} requests")
+        return batch.id
+
+    async def wait_for_batch(
+        self,
+        batch_id: str,
+        json_schema: Optional[Dict[str, Any]] = None,
+        poll_interval: Optional[float] = None
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Polls a batch until it finishes and returns the analysis results keyed by custom_id.
+        json_schema is the schema the requests were built with. Returns None if the batch did not complete.
+        """
+        if not self.client:
+            logger.error("LLM client not initialized. Cannot wait for batch.")
+            return None
+        poll_interval = settings.LLM_BATCH_POLL_SECONDS if poll_interval is None else poll_interval
+
+        try:
+            batch = await self.client.batches.retrieve(batch_id)
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                logger.debug(f"LLM batch {batch_id} is {batch.status}, checking again in {poll_interval}s")
+                await asyncio.sleep(poll_interval)
+                batch = await self.client.batches.retrieve(batch_id)
+
+            if batch.status != "completed":
+                logger.error(f"LLM batch {batch_id} finished with status '{batch.status}'")
+                return None
+            if not batch.output_file_id:
+                logger.warning(f"LLM batch {batch_id} completed without any successful requests")
+                return {}
+            output = await self.client.files.content(batch.output_file_id)
+        except OpenAIError as e:
+            logger.error(f"OpenAI API error while waiting for batch {batch_id}: {e}", exc_info=True)
+            return None
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for line in output.content.splitlines():
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                results[item["custom_id"]] = {"analysis_text": "", "error": f"Batch request failed: {item.get('error') or response.get('body')}"}
+                continue
+            message = ((response.get("body") or {}).get("choices") or [{}])[0].get("message") or {}
+            tool_calls = message.get("tool_calls")
+            analysis_text = tool_calls[0]["function"]["arguments"] if json_schema and tool_calls else message.get("content")
+            results[item["custom_id"]] = self._to_analysis_result(analysis_text, json_schema)
+        return results
+
 # Example usage (for testing, not part of the service itself)
 async def example_main():
     if not settings.OPENAI_API_KEY:
@@ -323,10 +619,7 @@ async def example_main():
     
     # Prompt for initial triage and categorization
     triage_prompt = """
-    Analyze the following news article content:
-    {content}
-
-    Based on this content, provide the following:
+    Analyze the news article content given at the end and provide the following:
     1. Category (e.g., Science, Technology, Politics, Environment, Health, Business, Other).
     2. Sentiment (Positive, Negative, Neutral).
     3. Key Claim (a concise summary of the main assertion or finding).
@@ -334,6 +627,9 @@ async def example_main():
     5. Keywords (3-5 specific, descriptive keywords related to the article topic).
 
     Return your response as a JSON object with keys: "category", "sentiment", "key_claim", "requires_deep_analysis", "keywords".
+
+    Article content:
+    {content}
     """
     
     # JSON schema for controlled response format
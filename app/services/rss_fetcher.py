@@ -1,54 +1,143 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
 import feedparser
-from typing import List, Dict, Any
+import httpx
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 import logging
 
+from pydantic import TypeAdapter, ValidationError
+
 from app.models.article import Article
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-def fetch_articles_from_feed(feed_url: str) -> List[Article]:
-    """Fetches and parses articles from a single RSS feed URL."""
-    parsed_feed = feedparser.parse(feed_url)
-    articles: List[Article] = []
+FEED_FETCH_TIMEOUT_SECONDS = 15
+
+# Conditional GET headers (ETag / Last-Modified) from each feed's last response, so unchanged feeds answer 304
+_feed_validators: Dict[str, Dict[str, str]] = {}
+
+# feedparser is pure Python, so parsing is done in worker processes to keep it off the event loop and the GIL
+_parse_pool: Optional[ProcessPoolExecutor] = None
 
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=min(len(settings.RSS_FEEDS), os.cpu_count() or 1) or 1)
+    return _parse_pool
+
+def shutdown_parse_pool() -> None:
+    """Stops the feed parsing worker processes, if they were started."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown()
+        _parse_pool = None
+
+# Built once; validating a whole feed in one call amortizes pydantic's per-call overhead
+_ARTICLE_LIST_ADAPTER = TypeAdapter(List[Article])
+
+def _entries_to_articles(parsed_feed: Any, feed_url: str) -> List[Article]:
+    """Builds Article objects from an already parsed feed."""
     source_name = parsed_feed.feed.get("title", "Unknown Source")
+    fetched_at = datetime.now(timezone.utc) # Fallback publication date for entries without one
 
+    rows = []
     for entry in parsed_feed.entries:
+        # Attempt to parse publication date
+        pub_date_parsed = entry.get("published_parsed")
+        rows.append({
+            "title": entry.get("title"),
+            "url": entry.get("link"),
+            "source_name": source_name,
+            "source_type": "rss", # Adding the required source_type field
+            "publication_date": datetime(*pub_date_parsed[:6], tzinfo=timezone.utc) if pub_date_parsed else fetched_at,
+            "summary": entry.get("summary"),
+            # full_text might require fetching the actual page, skip for now
+        })
+
+    try:
+        return _ARTICLE_LIST_ADAPTER.validate_python(rows)
+    except ValidationError:
+        pass
+
+    # Some entries are invalid; validate them one by one so only those are dropped
+    articles: List[Article] = []
+    for row in rows:
         try:
-            # Attempt to parse publication date
-            pub_date_parsed = entry.get("published_parsed")
-            if pub_date_parsed:
-                publication_date = datetime(*pub_date_parsed[:6], tzinfo=timezone.utc)
-            else:
-                publication_date = datetime.now(timezone.utc) # Fallback if no date
-
-            article = Article(
-                title=entry.title,
-                url=entry.link,
-                source_name=source_name,
-                source_type="rss", # Adding the required source_type field
-                publication_date=publication_date,
-                summary=entry.get("summary"),
-                # full_text might require fetching the actual page, skip for now
-            )
-            articles.append(article)
-        except Exception as e:
-            logger.error(f"Error parsing entry from {feed_url}: {entry.get('title')} - {e}")
+            articles.append(Article(**row))
+        except ValidationError as e:
+            logger.error(f"Error parsing entry from {feed_url}: {row.get('title')} - {e}")
     return articles
 
-def fetch_all_articles() -> List[Article]:
-    """Fetches articles from all configured RSS feeds."""
+def fetch_articles_from_feed(feed_url: str) -> List[Article]:
+    """Fetches and parses articles from a single RSS feed URL."""
+    return _entries_to_articles(feedparser.parse(feed_url), feed_url)
+
+async def _download_and_parse_feed(client: httpx.AsyncClient, feed_url: str) -> Optional[Any]:
+    """Downloads and parses a feed, or returns None if it has not changed since the last fetch."""
+    logger.info(f"Fetching articles from: {feed_url}")
+    response = await client.get(feed_url, headers=_feed_validators.get(feed_url, {}))
+    if response.status_code == 304:
+        logger.info(f"Feed not modified since last fetch: {feed_url}")
+        return None
+    response.raise_for_status()
+    # Pass the headers along so feedparser can detect the encoding the same way it does for URLs
+    parse = functools.partial(
+        feedparser.parse,
+        response.content,
+        response_headers={"content-location": str(response.url), **response.headers}
+    )
+    parsed_feed = await asyncio.get_running_loop().run_in_executor(_get_parse_pool(), parse)
+
+    # Only remembered once the feed was parsed, so a failed parse is retried in full next time
+    validators = {}
+    if response.headers.get("ETag"):
+        validators["If-None-Match"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        validators["If-Modified-Since"] = response.headers["Last-Modified"]
+    _feed_validators[feed_url] = validators
+    return parsed_feed
+
+async def fetch_all_articles_async(client: Optional[httpx.AsyncClient] = None) -> List[Article]:
+    """
+    Fetches articles from all configured RSS feeds concurrently, parsing each feed in a worker process.
+    Total time is bounded by the slowest feed instead of the sum of all of them; a failing feed is logged and skipped.
+    Feeds are requested conditionally, so a feed that has not changed since the last fetch is neither downloaded nor parsed.
+    """
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(
+            timeout=FEED_FETCH_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            headers={"User-Agent": feedparser.USER_AGENT}
+        )
+    try:
+        results = await asyncio.gather(
+            *[_download_and_parse_feed(client, feed_url) for feed_url in settings.RSS_FEEDS],
+            return_exceptions=True
+        )
+    finally:
+        if owns_client:
+            await client.aclose()
+
     all_articles: List[Article] = []
-    for feed_url in settings.RSS_FEEDS:
-        logger.info(f"Fetching articles from: {feed_url}")
-        try:
-            articles_from_feed = fetch_articles_from_feed(feed_url)
-            all_articles.extend(articles_from_feed)
-            logger.info(f"Fetched {len(articles_from_feed)} articles from {feed_url}")
-        except Exception as e:
-            logger.error(f"Failed to fetch or parse feed {feed_url}: {e}")
+    for feed_url, result in zip(settings.RSS_FEEDS, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to fetch or parse feed {feed_url}: {result}")
+            continue
+        if result is None: # Not modified, its articles were already ingested
+            continue
+        articles_from_feed = _entries_to_articles(result, feed_url)
+        all_articles.extend(articles_from_feed)
+        logger.info(f"Fetched {len(articles_from_feed)} articles from {feed_url}")
     return all_articles
 
-# Remove test code that's not needed in production
+def fetch_all_articles() -> List[Article]:
+    """Fetches articles from all configured RSS feeds. Synchronous entry point for scripts and workflows."""
+    try:
+        return asyncio.run(fetch_all_articles_async())
+    finally:
+        shutdown_parse_pool()
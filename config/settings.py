@@ -1,3 +1,4 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List, Optional
 
@@ -26,6 +27,25 @@ class Settings(BaseSettings):
     DEFAULT_LLM_MODEL_NAME: str = "gpt-3.5-turbo"
     TRIAGE_LLM_MODEL_NAME: Optional[str] = None # If None, will use DEFAULT_LLM_MODEL_NAME
     DEEP_ANALYSIS_LLM_MODEL_NAME: str = "gpt-4-turbo-preview"
+    LLM_MAX_CONCURRENT_REQUESTS: int = 20 # Upper bound on simultaneous LLM API calls
+    LLM_STREAM_RESPONSES: bool = True # Stream completions and stop reading once the JSON object is complete
+
+    # LLM response cache (only used for temperature 0 requests)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: Optional[str] = None # SQLite file to persist the cache across runs; in-memory only if None
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+
+    # OpenAI Batch API for bulk triage (lower cost, completes asynchronously within 24h)
+    LLM_USE_BATCH_API: bool = False # Only enable for providers that implement the Batch API
+    LLM_BATCH_MIN_ARTICLES: int = 50 # Triage runs larger than this go through the Batch API
+    LLM_BATCH_POLL_SECONDS: int = 30
+
+    @field_validator("OPENAI_BASE_URL", "DATABASE_URL")
+    @classmethod
+    def unescape_url(cls, v: Optional[str]) -> Optional[str]:
+        # Some .env loaders leave the colon escaped as \x3a
+        return v.replace("\\x3a", ":") if v else v
     
     # Use SettingsConfigDict instead of class-based Config
     model_config = SettingsConfigDict(
@@ -17,10 +17,7 @@ async def test_llm():
     """
     
     triage_prompt = """
-    Analyze the following news article content:
-    {content}
-
-    Based on this content, provide the following:
+    Analyze the news article content given at the end and provide the following:
     1. Category (e.g., Science, Technology, Politics, Environment, Health, Business, Other).
     2. Sentiment (Positive, Negative, Neutral).
     3. Key Claim (a concise summary of the main assertion or finding).
@@ -29,6 +26,9 @@ async def test_llm():
     6. Keywords (list of 3-5 key terms that best represent the article).
 
     Return your response as a JSON object with keys: "category", "sentiment", "key_claim", "requires_deep_analysis", "main_entities", "keywords".
+
+    Article content:
+    {content}
     """
     
     logger.info("Testing LLM service with sample content...")
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Equality matching on top-level fields; $nin is the only operator supported."""
+    for key, value in query.items():
+        if isinstance(value, dict) and "$nin" in value:
+            if document.get(key) in value["$nin"]:
+                return False
+        elif document.get(key) != value:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self._documents = documents
+
+    def skip(self, count: int) -> "FakeCursor":
+        self._documents = self._documents[count:]
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._documents[:length] if length else self._documents
+
+
+class FakeCollection:
+    """
+    List-backed stand-in for the few collection methods the endpoint tests exercise.
+    Setup helpers are synchronous, like mongomock; the methods the app awaits are async, like Motor.
+    Anything else raises AttributeError, so a test that needs more should use mongomock instead.
+    """
+
+    def __init__(self):
+        self.documents: List[Dict[str, Any]] = []
+
+    def insert_many(self, documents) -> None:
+        for document in documents:
+            document = dict(document)
+            document.setdefault("_id", ObjectId())
+            self.documents.append(document)
+
+    def delete_many(self, query: Dict[str, Any]) -> None:
+        self.documents = [document for document in self.documents if not _matches(document, query)]
+
+    def distinct(self, key: str) -> List[Any]:
+        return list({document[key] for document in self.documents if key in document})
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        return sum(1 for document in self.documents if _matches(document, query))
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None) -> FakeCursor:
+        matching = [document for document in self.documents if _matches(document, query or {})]
+        if not projection:
+            return FakeCursor([dict(document) for document in matching])
+        fields = [key for key, include in projection.items() if include and key != "_id"]
+        if projection.get("_id", 1):
+            fields.append("_id")
+        return FakeCursor([{key: document[key] for key in fields if key in document} for document in matching])
+
+    async def create_index(self, *args, **kwargs) -> Optional[str]:
+        return kwargs.get("name")
+
+
+class FakeDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self.articles = FakeCollection()
+
+
+class FakeMongoClient:
+    """Hands out one FakeDatabase per name, like a client connected to an in-memory server."""
+
+    def __init__(self):
+        self._databases: Dict[str, FakeDatabase] = {}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        return self._databases.setdefault(name, FakeDatabase(name))
+
+    def close(self) -> None:
+        pass
@@ -1,87 +1,146 @@
+import asyncio
+import logging
+from types import MappingProxyType
+
 import pytest
-import mongomock
-from fastapi.testclient import TestClient
-from httpx import AsyncClient
-
-# Import your FastAPI app and settings
-# Adjust the import path based on your project structure if needed
-from app.main import app
-from config.settings import Settings
-from app.db import DBManager, get_db, connect_to_mongo, close_mongo_connection
-
-# Override settings for testing
-def get_settings_override():
-    return Settings(
-        DATABASE_URL="mongodb://localhost:27017/test_news_aggregator", # Use a test DB name
-        RSS_FEEDS=["http://test.com/rss1", "http://test.com/rss2"],
-        OPENAI_API_KEY="test_openai_api_key", # Use a dummy key
-        # OPENAI_API_BASE_URL="http://localhost:1234/v1" # Dummy base URL - Removed
-    )
-
-# Fixture to override settings for the duration of a test session
-@pytest.fixture(scope="session", autouse=True)
-def override_app_settings(session_mocker):
-    # This uses pytest-mock's session_mocker to patch settings globally for tests
-    # This approach is cleaner if your app directly imports 'settings' from config.settings
-    session_mocker.patch("app.db.settings", get_settings_override())
-    session_mocker.patch("app.services.rss_fetcher.settings", get_settings_override())
-    session_mocker.patch("app.services.llm_service.settings", get_settings_override())
-    # Add other modules that import 'settings' directly if necessary
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from tests._fake_mongo import FakeMongoClient
+
+logger = logging.getLogger(__name__)
+
+# Settings are read from the environment when config.settings is first imported, so the test environment
+# is set before any app import and undone when the session ends. The app itself is imported inside the
+# fixtures that need it, so running only the model or cache tests does not load FastAPI and the routers.
+_test_env = pytest.MonkeyPatch()
+_test_env.setenv("DATABASE_URL", "mongodb://localhost:27017/test_news_aggregator") # Use a test DB name
+_test_env.setenv("OPENAI_API_KEY", "test_openai_api_key") # Use a dummy key
+_test_env.setenv("RSS_FEEDS", '["http://test.com/rss1", "http://test.com/rss2"]')
+
+def pytest_unconfigure(config):
+    _test_env.undo()
+
+def pytest_asyncio_loop_factories(config, item):
+    """Runs the async tests on uvloop, as uvicorn does in production, where uvloop is available."""
+    try:
+        import uvloop
+    except ImportError: # uvloop does not support Windows
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
 
 @pytest.fixture(scope="session")
 def db_manager_session():
-    """Session-scoped fixture to manage DB connection for all tests."""
-    # Ensure settings are overridden before connecting
-    test_settings = get_settings_override()
-    DBManager.client = mongomock.MongoClient(test_settings.DATABASE_URL)
-    db_name = test_settings.DATABASE_URL.split("/")[-1]
-    DBManager.db = DBManager.client[db_name]
-    print(f"Mock MongoDB setup for session at {test_settings.DATABASE_URL}")
-    yield DBManager
-    print("Mock MongoDB closing for session.")
-    if DBManager.client:
-        DBManager.client.close()
+    """
+    Session-scoped fixture to manage DB connection for all tests.
+    The endpoint tests only need equality queries, so the app gets a small list-backed fake instead of
+    mongomock; the fixture yields the same database for test setup.
+    """
+    from app.db import DBManager
+    from config.settings import settings
+
+    mongo_client = FakeMongoClient()
+    db_name = settings.DATABASE_URL.split("/")[-1]
+    # connect_to_mongo runs during app startup; make it connect to the same in-memory fake
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr("app.db.AsyncIOMotorClient", lambda *args, **kwargs: mongo_client)
+    DBManager.client = mongo_client
+    DBManager.db = mongo_client[db_name]
+    logger.debug("Mock MongoDB setup for session at %s", settings.DATABASE_URL)
+    yield DBManager.db
+    logger.debug("Mock MongoDB closing for session.")
+    monkeypatch.undo()
     DBManager.client = None
     DBManager.db = None
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_db(db_manager_session):
-    """Provides a mock database instance for a test, ensuring it's clean."""
-    db = db_manager_session.db
-    # Clean up collections before each test if needed, or manage per-test data
-    # For example, to clear the 'articles' collection:
-    # db.articles.delete_many({})
-    return db
+    """Provides the session's mock database; use the article collection fixtures for per-test data."""
+    return db_manager_session
 
-@pytest.fixture
-def article_collection(mock_db):
-    """Provides a clean 'articles' collection for each test."""
-    collection = mock_db.articles
-    collection.delete_many({}) # Clear before each test using this fixture
+@pytest.fixture(scope="session")
+def sample_articles_data():
+    """Sample articles for the read-only endpoint tests, built once per session and read-only."""
+    return tuple(MappingProxyType(article) for article in (
+        {
+            "title": "Positive News Today",
+            "url": "http://example.com/positive",
+            "source_name": "Good News Network",
+            "llm_sentiment": "Positive",
+            "other_field": "some_value_1"
+        },
+        {
+            "title": "Neutral Report on Markets",
+            "url": "http://example.com/neutral",
+            "source_name": "MarketWatch",
+            "llm_sentiment": "Neutral",
+            "other_field": "some_value_2"
+        },
+        {
+            "title": "Another Positive Story",
+            "url": "http://example.com/positive2",
+            "source_name": "Happy Times",
+            "llm_sentiment": "Positive",
+            "other_field": "some_value_3"
+        },
+        {
+            "title": "Negative Outlook on Weather",
+            "url": "http://example.com/negative",
+            "source_name": "Weather Channel",
+            "llm_sentiment": "Negative",
+            "other_field": "some_value_4"
+        }
+    ))
+
+def insert_sample_articles(collection, sample_articles_data):
+    # The fake collection stores copies, so the read-only views can be inserted directly
+    collection.insert_many(sample_articles_data)
+
+@pytest.fixture(scope="session")
+def article_collection(db_manager_session, sample_articles_data):
+    """Provides the 'articles' collection, populated with sample_articles_data once per session."""
+    collection = db_manager_session.articles
+    collection.delete_many({})
+    insert_sample_articles(collection, sample_articles_data)
     return collection
 
+@pytest.fixture
+def clean_articles(article_collection):
+    """Provides the session's 'articles' collection and removes any documents the test adds to it."""
+    snapshot = article_collection.distinct("_id")
+    yield article_collection
+    article_collection.delete_many({"_id": {"$nin": snapshot}})
+
+@pytest.fixture
+def empty_article_collection(article_collection, sample_articles_data):
+    """Provides the 'articles' collection emptied for one test; the sample data is restored afterwards."""
+    article_collection.delete_many({})
+    yield article_collection
+    article_collection.delete_many({})
+    insert_sample_articles(article_collection, sample_articles_data)
+
 
 # Fixture for an AsyncTestClient, configured for your app
-@pytest.fixture(scope="module")
-async def async_client(): # Changed scope to module for efficiency
-    # Ensure DB is connected using overridden settings before client is created
-    # The db_manager_session fixture should handle this if autouse=True or if it's explicitly used
-    # by another fixture that this client depends on.
-    # For safety, we can explicitly call connect_to_mongo here,
-    # but it should use the mocked DBManager.client
-    
-    # This is tricky because app startup/shutdown events handle DB connection.
-    # TestClient/AsyncClient for FastAPI handles lifespan events.
-
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        print("AsyncTestClient created")
-        yield client
-        print("AsyncTestClient closing")
+# Session-scoped so the app starts once per test run; pytest.ini runs tests in the same session event loop
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client(db_manager_session):
+    from app.main import app
+
+    # httpx's ASGITransport does not run the app's lifespan, so it is entered explicitly;
+    # startup (connect_to_mongo) then runs exactly once, against the mock from db_manager_session
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            logger.debug("AsyncTestClient created")
+            yield client
+            logger.debug("AsyncTestClient closing")
 
 # If you need a synchronous TestClient (e.g., for non-async parts or simpler tests)
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
     # This will also trigger startup/shutdown events if app has them
     with TestClient(app) as c:
         yield c
@@ -0,0 +1,217 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+from bson import ObjectId
+from mongomock.collection import BulkOperationBuilder
+from mongomock_motor import AsyncMongoMockClient
+
+from app.models.article import Article
+from app.services import article_service
+
+
+@pytest.fixture
+def service_collection(monkeypatch):
+    """Provides an async mongomock 'articles' collection wired into article_service."""
+    # pymongo >= 4.11 passes a 'sort' argument to bulk updates that mongomock does not accept yet
+    add_update = BulkOperationBuilder.add_update
+    monkeypatch.setattr(
+        BulkOperationBuilder, "add_update",
+        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs)
+    )
+    collection = AsyncMongoMockClient()["test_news_aggregator"]["articles"]
+    monkeypatch.setattr(article_service, "get_article_collection", AsyncMock(return_value=collection))
+    return collection
+
+
+def make_article(**overrides) -> Article:
+    article_data = {
+        "title": "Service Test Title",
+        "url": "http://example.com/service-article",
+        "source_name": "Service Source",
+        "source_type": "rss",
+        "summary": "Original summary.",
+        "publication_date": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    }
+    article_data.update(overrides)
+    return Article(**article_data)
+
+
+@pytest.mark.asyncio
+async def test_list_articles_returns_page_sorted_by_publication_date(service_collection):
+    await service_collection.insert_many([
+        {
+            "title": f"Article {day}",
+            "url": f"http://example.com/list-{day}",
+            "source_name": "List Source",
+            "source_type": "rss",
+            "publication_date": datetime(2024, 1, day, tzinfo=timezone.utc),
+        }
+        for day in range(1, 6)
+    ])
+
+    articles = await article_service.list_articles(skip=1, limit=2)
+
+    assert [article["title"] for article in articles] == ["Article 4", "Article 3"]
+    assert all(article["id"] and "_id" not in article for article in articles)
+
+
+@pytest.mark.asyncio
+async def test_save_articles_skips_unchanged_content(service_collection):
+    article = make_article()
+
+    first = await article_service.save_articles([article])
+    assert first["inserted"] == 1
+
+    first_stored = await service_collection.find_one({"url": "http://example.com/service-article"})
+
+    # A re-fetch of the same content has a new fetched_date, which must not cause a write
+    refetched = make_article(fetched_date=article.fetched_date + timedelta(hours=1))
+    second = await article_service.save_articles([refetched])
+    assert second["updated"] == 0
+    assert second["unchanged"] == 1
+    stored = await service_collection.find_one({"url": "http://example.com/service-article"})
+    assert stored["fetched_date"] == first_stored["fetched_date"]
+
+    changed = await article_service.save_articles([make_article(summary="Corrected summary.")])
+    assert changed["updated"] == 1
+    assert changed["unchanged"] == 0
+    stored = await service_collection.find_one({"url": "http://example.com/service-article"})
+    assert stored["summary"] == "Corrected summary."
+    assert stored["content_hash"] == article_service.compute_content_hash(make_article(summary="Corrected summary."))
+
+
+@pytest.mark.asyncio
+async def test_save_articles_refreshes_metadata_when_content_unchanged(service_collection):
+    await article_service.save_articles([make_article()])
+
+    corrected_date = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    result = await article_service.save_articles([make_article(source_name="Renamed Source", publication_date=corrected_date)])
+
+    assert result["unchanged"] == 1
+    assert result["updated"] == 0 # Only content changes count as updates
+    stored = await service_collection.find_one({"url": "http://example.com/service-article"})
+    assert stored["source_name"] == "Renamed Source"
+    assert stored["publication_date"].replace(tzinfo=timezone.utc) == corrected_date
+
+
+@pytest.mark.asyncio
+async def test_save_articles_updates_documents_without_content_hash(service_collection):
+    # Documents stored before content hashing was introduced have no content_hash field
+    await service_collection.insert_one({
+        "title": "Service Test Title",
+        "url": "http://example.com/service-article",
+        "source_name": "Service Source",
+        "source_type": "rss",
+        "summary": "Original summary.",
+    })
+
+    result = await article_service.save_articles([make_article()])
+
+    assert result["updated"] == 1
+    assert result["unchanged"] == 0
+    stored = await service_collection.find_one({"url": "http://example.com/service-article"})
+    assert stored["content_hash"] == article_service.compute_content_hash(make_article())
+
+
+@pytest.mark.asyncio
+async def test_save_articles_stores_title_tokens(service_collection):
+    await article_service.save_articles([make_article(title="The Budget Vote in the Senate")])
+
+    stored = await service_collection.find_one({"url": "http://example.com/service-article"})
+    assert stored["title_tokens"] == ["budget", "senate", "vote"]
+
+
+@pytest.mark.asyncio
+async def test_get_related_articles_raw_returns_documents_with_id(service_collection):
+    result = await service_collection.insert_many([
+        {"title": "Related", "url": "http://example.com/related", "source_name": "B", "source_type": "rss"},
+        {"title": "Unrelated", "url": "http://example.com/unrelated", "source_name": "C", "source_type": "rss"},
+    ])
+    related_id = str(result.inserted_ids[0])
+    source = await service_collection.insert_one({
+        "title": "Source", "url": "http://example.com/source", "source_name": "A", "source_type": "rss",
+        "related_article_ids": [related_id, "not-an-object-id"],
+    })
+
+    related = await article_service.get_related_articles_raw(str(source.inserted_id))
+
+    assert [doc["id"] for doc in related] == [related_id]
+    assert "_id" not in related[0]
+    assert await article_service.get_related_articles_raw("not-an-object-id") == []
+
+
+@pytest.mark.asyncio
+async def test_find_and_link_related_articles_skips_articles_below_threshold(service_collection):
+    article = make_article(id="65f000000000000000000001", title="Budget", llm_keywords=["budget"], publication_date=None)
+
+    assert await article_service.find_and_link_related_articles(article) == ([], [])
+    article_service.get_article_collection.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_perform_deep_article_analysis_does_not_store_invalid_results(service_collection, monkeypatch):
+    error = "Schema validation failed: data.bias must be one of ['Low', 'Medium', 'High']"
+    monkeypatch.setattr(article_service.llm_service, "client", object())
+    monkeypatch.setattr(article_service.llm_service, "analyze_content", AsyncMock(return_value={
+        "analysis_text": "{}", "parsed": {"key_claim": "JSON parsing error", "error": error}, "error": error
+    }))
+    inserted = await service_collection.insert_one({
+        "title": "Deep Title", "url": "http://example.com/deep", "source_name": "Deep Source", "source_type": "rss",
+        "summary": "Deep summary."
+    })
+
+    await article_service.perform_deep_article_analysis(str(inserted.inserted_id))
+
+    stored = await service_collection.find_one({"_id": inserted.inserted_id})
+    assert "llm_deep_analysis_results" not in stored # Still eligible for deep analysis
+
+
+@pytest.mark.asyncio
+async def test_triage_new_articles_analyzes_articles_concurrently(service_collection, monkeypatch):
+    in_flight = []
+    max_in_flight = 0
+
+    async def fake_analyze(article):
+        nonlocal max_in_flight
+        in_flight.append(article.url)
+        max_in_flight = max(max_in_flight, len(in_flight))
+        await asyncio.sleep(0)
+        in_flight.remove(article.url)
+        article.llm_category = "Politics"
+        article.llm_analysis_raw_response = {"category": "Politics"}
+        return article
+
+    monkeypatch.setattr(article_service.llm_service, "client", object())
+    monkeypatch.setattr(article_service, "analyze_and_enrich_article", fake_analyze)
+    monkeypatch.setattr(article_service, "find_and_link_related_articles", AsyncMock(return_value=([], [])))
+    await service_collection.insert_many([
+        {"title": f"Triage {n}", "url": f"http://example.com/triage-{n}", "source_name": "T", "source_type": "rss"}
+        for n in range(3)
+    ])
+
+    result = await article_service.triage_new_articles()
+
+    assert result["analyzed"] == 3
+    assert max_in_flight == 3
+    assert await service_collection.count_documents({"llm_category": "Politics"}) == 3
+
+
+def test_parse_object_ids_skips_malformed_ids():
+    valid_id = "65f000000000000000000001"
+
+    assert article_service.parse_object_ids([valid_id, "not-an-object-id", None]) == [ObjectId(valid_id)]
+
+
+def test_apply_triage_analysis_uses_already_parsed_result():
+    analysis_result = {
+        "analysis_text": "{unparsed}",
+        "parsed": {"category": "Politics", "requires_deep_analysis": "Yes", "keywords": ["budget"]},
+    }
+
+    article = article_service.apply_triage_analysis(make_article(), analysis_result)
+
+    assert article.llm_category == "Politics"
+    assert article.llm_requires_deep_analysis is True
+    assert article.llm_keywords == ["budget"]
@@ -0,0 +1,21 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from mongomock_motor import AsyncMongoMockClient
+
+from app import db
+
+
+@pytest.mark.asyncio
+async def test_create_url_index_reports_duplicate_urls(monkeypatch):
+    collection = AsyncMongoMockClient()["test_news_aggregator"]["articles"]
+    monkeypatch.setattr(db, "get_article_collection", AsyncMock(return_value=collection))
+    monkeypatch.setattr(db.DBManager, "index_warnings", [])
+    await collection.insert_many([{"url": "http://example.com/dup"}, {"url": "http://example.com/dup"}])
+
+    await db.create_url_index()
+
+    assert len(db.DBManager.index_warnings) == 1
+    assert "http://example.com/dup" in db.DBManager.index_warnings[0]
+    index_info = await collection.index_information()
+    assert "url_index" in index_info and "url_unique_index" not in index_info
@@ -1,116 +1,45 @@
+import asyncio
 import pytest
+from operator import itemgetter
+from urllib.parse import quote
+from types import MappingProxyType
 from httpx import AsyncClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
-# The FastAPI app instance
-from app.main import app
+from app.api import db_visualization
 
-# Assuming your conftest.py sets up a mongomock client and db
-# and provides an 'article_collection' fixture which is a clean mongomock collection.
+SENTIMENT_URL = "/api/db/articles_by_sentiment/"
+PROJECTED_FIELDS = ("title", "url", "source_name") # Fields the sentiment endpoint projects
 
-# Sample articles to be used in tests
-sample_articles_data = [
-    {
-        "title": "Positive News Today",
-        "url": "http://example.com/positive",
-        "source_name": "Good News Network",
-        "llm_sentiment": "Positive",
-        "other_field": "some_value_1"
-    },
-    {
-        "title": "Neutral Report on Markets",
-        "url": "http://example.com/neutral",
-        "source_name": "MarketWatch",
-        "llm_sentiment": "Neutral",
-        "other_field": "some_value_2"
-    },
-    {
-        "title": "Another Positive Story",
-        "url": "http://example.com/positive2",
-        "source_name": "Happy Times",
-        "llm_sentiment": "Positive",
-        "other_field": "some_value_3"
-    },
-    {
-        "title": "Negative Outlook on Weather",
-        "url": "http://example.com/negative",
-        "source_name": "Weather Channel",
-        "llm_sentiment": "Negative",
-        "other_field": "some_value_4"
-    }
-]
-
-@pytest.mark.asyncio
-async def test_get_articles_by_sentiment_with_data(async_client: AsyncClient, article_collection):
-    """
-    Test retrieving articles for a sentiment label that has matching articles.
-    """
-    # Populate the mock collection with sample data
-    await article_collection.insert_many(sample_articles_data)
-
-    sentiment_to_test = "Positive"
-    response = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test}")
-
-    assert response.status_code == 200
-    response_json = response.json()
-    assert "articles" in response_json
-    
-    returned_articles = response_json["articles"]
-    expected_articles = [
-        {
-            "title": "Positive News Today",
-            "url": "http://example.com/positive",
-            "source_name": "Good News Network"
-        },
-        {
-            "title": "Another Positive Story",
-            "url": "http://example.com/positive2",
-            "source_name": "Happy Times"
-        }
-    ]
-    
-    # Check if all expected articles are present and no others
-    assert len(returned_articles) == len(expected_articles)
-    for expected_article in expected_articles:
-        assert expected_article in returned_articles
-    
-    for article in returned_articles:
-        assert article["title"] is not None
-        assert article["url"] is not None
-        assert article["source_name"] is not None
-        assert len(article.keys()) == 3 # Ensure only projected fields are present
+# conftest.py provides an 'article_collection' fixture populated once per session with sample_articles_data.
 
-@pytest.mark.asyncio
-async def test_get_articles_by_sentiment_no_data(async_client: AsyncClient, article_collection):
-    """
-    Test retrieving articles for a sentiment label that has no matching articles.
-    """
-    await article_collection.insert_many(sample_articles_data) # Insert some data, but not for "UniqueSentiment"
-    
-    sentiment_to_test = "UniqueSentiment"
-    response = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test}")
-    
-    assert response.status_code == 200
-    response_json = response.json()
-    assert "articles" in response_json
-    assert response_json["articles"] == []
+EMPTY_BODY = b'{"articles":[]}'
 
+# Sentiment matching is an exact string match, so it is case-sensitive
 @pytest.mark.asyncio
-async def test_get_articles_by_sentiment_non_existent_label(async_client: AsyncClient, article_collection):
+@pytest.mark.parametrize("sentiment_label, expected_articles", [
+    ("Positive", {
+        ("Positive News Today", "http://example.com/positive", "Good News Network"),
+        ("Another Positive Story", "http://example.com/positive2", "Happy Times"),
+    }),
+    ("UniqueSentiment", set()),
+    ("NonExistentSentiment", set()),
+    ("positive", set()),
+    ("POSITIVE", set()),
+])
+async def test_get_articles_by_sentiment(async_client: AsyncClient, article_collection, sentiment_label, expected_articles):
     """
-    Test retrieving articles for a sentiment label that effectively doesn't exist in any data.
-    This should behave the same as a sentiment with no matching articles.
+    Test retrieving articles for a sentiment label, with and without matching articles.
     """
-    # No data inserted, or data irrelevant to "NonExistentSentiment"
-    await article_collection.insert_many(sample_articles_data)
+    response = await async_client.get(SENTIMENT_URL + quote(sentiment_label, safe=""))
 
-    sentiment_to_test = "NonExistentSentiment" # A label not in sample_articles_data
-    response = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test}")
-    
     assert response.status_code == 200
-    response_json = response.json()
-    assert "articles" in response_json
-    assert response_json["articles"] == []
+    if not expected_articles:
+        assert response.content == EMPTY_BODY
+        return
+    returned_articles = response.json()["articles"]
+    assert all(article.keys() == set(PROJECTED_FIELDS) for article in returned_articles)
+    assert {tuple(article[field] for field in PROJECTED_FIELDS) for article in returned_articles} == expected_articles
 
 @pytest.mark.asyncio
 async def test_get_articles_by_sentiment_database_error(async_client: AsyncClient):
@@ -122,10 +51,8 @@ async def test_get_articles_by_sentiment_database_error(async_client: AsyncClien
     
     # Mock 'get_article_collection' in the context of the API route module
     # to raise an exception when called.
-    with patch("app.api.db_visualization.get_article_collection") as mock_get_collection:
-        mock_get_collection.side_effect = Exception("Simulated database error")
-        
-        response = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test}")
+    with patch.object(db_visualization, "get_article_collection", side_effect=Exception("Simulated database error")):
+        response = await async_client.get(SENTIMENT_URL + quote(sentiment_to_test, safe=""))
         
         assert response.status_code == 200 # As per current error handling in the endpoint
         response_json = response.json()
@@ -133,21 +60,18 @@ async def test_get_articles_by_sentiment_database_error(async_client: AsyncClien
         assert response_json["error"] == "Database error"
 
 @pytest.mark.asyncio
-async def test_get_articles_by_sentiment_empty_db(async_client: AsyncClient, article_collection):
+async def test_get_articles_by_sentiment_empty_db(async_client: AsyncClient, empty_article_collection):
     """
     Test retrieving articles for a sentiment label when the database/collection is empty.
     """
-    # article_collection is already clean due to the fixture's scope
     sentiment_to_test = "Positive"
-    response = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test}")
+    response = await async_client.get(SENTIMENT_URL + quote(sentiment_to_test, safe=""))
     
     assert response.status_code == 200
-    response_json = response.json()
-    assert "articles" in response_json
-    assert response_json["articles"] == []
+    assert response.content == EMPTY_BODY
 
 @pytest.mark.asyncio
-async def test_get_articles_by_sentiment_url_encoding(async_client: AsyncClient, article_collection):
+async def test_get_articles_by_sentiment_url_encoding(async_client: AsyncClient, clean_articles):
     """
     Test retrieving articles with a sentiment label that might require URL encoding (e.g., contains spaces).
     """
@@ -160,84 +84,24 @@ async def test_get_articles_by_sentiment_url_encoding(async_client: AsyncClient,
             "other_field": "some_value_space"
         }
     ]
-    await article_collection.insert_many(articles_with_spaces_in_sentiment)
+    clean_articles.insert_many(articles_with_spaces_in_sentiment)
     
     sentiment_to_test = "Very Positive Outlook"
-    # The client should handle URL encoding, but the path parameter itself will be decoded by FastAPI
-    response = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test}")
+    # Sent percent-encoded ("Very%20Positive%20Outlook"); FastAPI decodes the path parameter
+    response = await async_client.get(SENTIMENT_URL + quote(sentiment_to_test, safe=""))
     
     assert response.status_code == 200
-    response_json = response.json()
-    assert "articles" in response_json
-    assert len(response_json["articles"]) == 1
-    assert response_json["articles"][0]["title"] == "Spacey Sentiment Article"
-    assert response_json["articles"][0]["llm_sentiment"] == "Very Positive Outlook" # This field is not returned by endpoint
-
-    # Corrected assertion: check the returned (projected) fields
-    expected_article = {
+    # Only the projected fields come back; llm_sentiment and other_field are stored but not returned
+    assert response.json() == {"articles": [{
         "title": "Spacey Sentiment Article",
         "url": "http://example.com/spacey",
         "source_name": "Space News"
-    }
-    assert response_json["articles"][0] == expected_article
-
-# Add a test for case-sensitivity if applicable.
-# The current implementation uses exact string match for sentiment.
-@pytest.mark.asyncio
-async def test_get_articles_by_sentiment_case_sensitivity(async_client: AsyncClient, article_collection):
-    """
-    Test if sentiment matching is case-sensitive.
-    MongoDB string comparisons are typically case-sensitive by default.
-    """
-    await article_collection.insert_many(sample_articles_data) # Uses "Positive"
-    
-    sentiment_to_test_lowercase = "positive" # Query with lowercase
-    response = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test_lowercase}")
-    
-    assert response.status_code == 200
-    response_json = response.json()
-    assert "articles" in response_json
-    # Expect empty if the query is case-sensitive and "positive" is not in the DB
-    # (assuming "Positive" is in the DB from sample_articles_data)
-    assert response_json["articles"] == []
-
-    sentiment_to_test_uppercase = "POSITIVE" # Query with uppercase
-    response_upper = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test_uppercase}")
-    assert response_upper.status_code == 200
-    response_json_upper = response_upper.json()
-    assert "articles" in response_json_upper
-    assert response_json_upper["articles"] == []
-
-    # Now test with the exact case
-    sentiment_to_test_exact = "Positive"
-    response_exact = await async_client.get(f"/api/db/articles_by_sentiment/{sentiment_to_test_exact}")
-    assert response_exact.status_code == 200
-    response_json_exact = response_exact.json()
-    assert "articles" in response_json_exact
-    assert len(response_json_exact["articles"]) == 2 # From sample_articles_data
-
-    # Clean up the test case for URL encoding, the llm_sentiment field is not returned.
-    # The previous test case for URL encoding had an assertion error.
-    # I will fix it now.
-    # This is a duplicate of the previous test case, I will remove it.
-    # The fix is in the original test case.
-    # The original test was:
-    # assert response_json["articles"][0]["llm_sentiment"] == "Very Positive Outlook"
-    # This is incorrect because llm_sentiment is not projected.
-    # The corrected assertion is:
-    # expected_article = {
-    #     "title": "Spacey Sentiment Article",
-    #     "url": "http://example.com/spacey",
-    #     "source_name": "Space News"
-    # }
-    # assert response_json["articles"][0] == expected_article
-    # This has been already corrected in the original test case test_get_articles_by_sentiment_url_encoding.
-    # So no further changes needed here.
-    pass
+    }]}
 
 # --- New Sample Data and Tests for /api/db/articles endpoint ---
 
-sample_articles_data_for_filtering = [
+# Read-only, like the conftest sample data; the collection stores copies
+sample_articles_data_for_filtering = tuple(MappingProxyType(article) for article in (
     {
         "_id": "filter_1", "title": "Positive News Today", "url": "http://example.com/positive",
         "source_name": "Good News Network", "llm_sentiment": "Positive",
@@ -262,18 +126,25 @@ sample_articles_data_for_filtering = [
         "_id": "filter_5", "title": "Tech Article Requiring Analysis", "url": "http://example.com/tech",
         "source_name": "Tech Today", "llm_sentiment": "Neutral",
         "llm_category": "Technology", "llm_requires_deep_analysis": True, "fetched_date": "2023-01-05T00:00:00Z"
-    }
-]
+    },
+))
+
+@pytest.fixture(scope="module")
+def filtering_collection(article_collection, sample_articles_data):
+    """The 'articles' collection holding only sample_articles_data_for_filtering, loaded once for all filter tests."""
+    article_collection.delete_many({})
+    article_collection.insert_many(sample_articles_data_for_filtering)
+    yield article_collection
+    article_collection.delete_many({})
+    article_collection.insert_many(sample_articles_data)
+
+get_title = itemgetter("title")
 
 def assert_articles_match_titles(response_articles: list, expected_titles: set):
-    returned_titles = {article['title'] for article in response_articles}
-    assert returned_titles == expected_titles
+    assert set(map(get_title, response_articles)) == expected_titles
 
 @pytest.mark.asyncio
-async def test_get_articles_no_filters(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
+async def test_get_articles_no_filters(async_client: AsyncClient, filtering_collection):
     response = await async_client.get("/api/db/articles?limit=10")
     assert response.status_code == 200
     response_json = response.json()
@@ -286,109 +157,47 @@ async def test_get_articles_no_filters(async_client: AsyncClient, article_collec
     assert response_json["page"] == 1
     assert response_json["pages"] == 1
 
+# Filtering is an exact match, so string filters are case-sensitive
 @pytest.mark.asyncio
-async def test_get_articles_single_string_filter(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
-    response = await async_client.get("/api/db/articles?source_name=MarketWatch")
-    assert response.status_code == 200
-    response_json = response.json()
-    
-    assert len(response_json["articles"]) == 1
-    assert response_json["total"] == 1
-    assert response_json["active_filters"] == {"source_name": "MarketWatch"}
-    assert_articles_match_titles(response_json["articles"], {"Neutral Report on Markets"})
-
-@pytest.mark.asyncio
-async def test_get_articles_single_boolean_filter_true(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
-    response = await async_client.get("/api/db/articles?llm_requires_deep_analysis=true")
-    assert response.status_code == 200
-    response_json = response.json()
-    
-    assert len(response_json["articles"]) == 3
-    assert response_json["total"] == 3
-    assert response_json["active_filters"] == {"llm_requires_deep_analysis": True}
-    assert_articles_match_titles(response_json["articles"], {
+@pytest.mark.parametrize("query, expected_filters, expected_titles", [
+    ("source_name=MarketWatch", {"source_name": "MarketWatch"}, {"Neutral Report on Markets"}),
+    ("llm_requires_deep_analysis=true", {"llm_requires_deep_analysis": True}, {
         "Neutral Report on Markets", "Negative Outlook on Weather", "Tech Article Requiring Analysis"
-    })
-
-@pytest.mark.asyncio
-async def test_get_articles_single_boolean_filter_false(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
-    response = await async_client.get("/api/db/articles?llm_requires_deep_analysis=false")
-    assert response.status_code == 200
-    response_json = response.json()
-    
-    assert len(response_json["articles"]) == 2
-    assert response_json["total"] == 2
-    assert response_json["active_filters"] == {"llm_requires_deep_analysis": False}
-    assert_articles_match_titles(response_json["articles"], {
+    }),
+    ("llm_requires_deep_analysis=false", {"llm_requires_deep_analysis": False}, {
         "Positive News Today", "Another Positive Story"
-    })
-
-@pytest.mark.asyncio
-async def test_get_articles_multiple_filters(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
-    response = await async_client.get("/api/db/articles?source_name=Good+News+Network&llm_sentiment=Positive&llm_category=News")
-    assert response.status_code == 200
-    response_json = response.json()
-    
-    assert len(response_json["articles"]) == 1
-    assert response_json["total"] == 1
-    assert response_json["active_filters"] == {
+    }),
+    ("source_name=Good+News+Network&llm_sentiment=Positive&llm_category=News", {
         "source_name": "Good News Network",
         "llm_sentiment": "Positive",
         "llm_category": "News"
-    }
-    assert_articles_match_titles(response_json["articles"], {"Positive News Today"})
-
-@pytest.mark.asyncio
-async def test_get_articles_multiple_filters_mixed_types(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
-    response = await async_client.get("/api/db/articles?llm_sentiment=Neutral&llm_requires_deep_analysis=true")
-    assert response.status_code == 200
-    response_json = response.json()
-    
-    assert len(response_json["articles"]) == 2
-    assert response_json["total"] == 2
-    assert response_json["active_filters"] == {
+    }, {"Positive News Today"}),
+    ("llm_sentiment=Neutral&llm_requires_deep_analysis=true", {
         "llm_sentiment": "Neutral",
         "llm_requires_deep_analysis": True
-    }
-    assert_articles_match_titles(response_json["articles"], {
-        "Neutral Report on Markets", "Tech Article Requiring Analysis"
-    })
-
-@pytest.mark.asyncio
-async def test_get_articles_filter_no_results(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
-    response = await async_client.get("/api/db/articles?source_name=NonExistentSource")
+    }, {"Neutral Report on Markets", "Tech Article Requiring Analysis"}),
+    ("source_name=NonExistentSource", {"source_name": "NonExistentSource"}, set()),
+    ("llm_category=news", {"llm_category": "news"}, set()),
+    ("llm_category=News", {"llm_category": "News"}, {"Positive News Today"}),
+])
+async def test_get_articles_filters(async_client: AsyncClient, filtering_collection, query, expected_filters, expected_titles):
+    response = await async_client.get(f"/api/db/articles?{query}")
     assert response.status_code == 200
     response_json = response.json()
-    
-    assert len(response_json["articles"]) == 0
-    assert response_json["total"] == 0
-    assert response_json["active_filters"] == {"source_name": "NonExistentSource"}
+
+    assert response_json["total"] == len(expected_titles)
+    assert response_json["active_filters"] == expected_filters
+    assert_articles_match_titles(response_json["articles"], expected_titles)
 
 @pytest.mark.asyncio
-async def test_get_articles_pagination_with_filters(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
-    # Request 1
-    response1 = await async_client.get("/api/db/articles?llm_requires_deep_analysis=true&limit=2&skip=0")
+async def test_get_articles_pagination_with_filters(async_client: AsyncClient, filtering_collection):
+    # Both pages are read from unchanging data, so they can be requested concurrently
+    response1, response2 = await asyncio.gather(
+        async_client.get("/api/db/articles?llm_requires_deep_analysis=true&limit=2&skip=0"),
+        async_client.get("/api/db/articles?llm_requires_deep_analysis=true&limit=2&skip=2"),
+    )
+
+    # Page 1
     assert response1.status_code == 200
     response1_json = response1.json()
     
@@ -398,12 +207,11 @@ async def test_get_articles_pagination_with_filters(async_client: AsyncClient, a
     assert response1_json["pages"] == 2
     assert response1_json["active_filters"] == {"llm_requires_deep_analysis": True}
     # Titles for first page (order might vary, so check against expected set for this page)
-    page1_titles = {article['title'] for article in response1_json['articles']}
+    page1_titles = set(map(get_title, response1_json['articles']))
     assert len(page1_titles.intersection({"Neutral Report on Markets", "Negative Outlook on Weather", "Tech Article Requiring Analysis"})) == 2
 
 
-    # Request 2
-    response2 = await async_client.get("/api/db/articles?llm_requires_deep_analysis=true&limit=2&skip=2")
+    # Page 2
     assert response2.status_code == 200
     response2_json = response2.json()
     
@@ -415,28 +223,3 @@ async def test_get_articles_pagination_with_filters(async_client: AsyncClient, a
     # Check remaining title
     remaining_titles = {"Neutral Report on Markets", "Negative Outlook on Weather", "Tech Article Requiring Analysis"} - page1_titles
     assert_articles_match_titles(response2_json["articles"], remaining_titles)
-
-
-@pytest.mark.asyncio
-async def test_get_articles_filter_case_sensitivity(async_client: AsyncClient, article_collection):
-    await article_collection.delete_many({})
-    await article_collection.insert_many(sample_articles_data_for_filtering)
-    
-    # Test with lowercase when DB has uppercase
-    response_lower = await async_client.get("/api/db/articles?llm_category=news")
-    assert response_lower.status_code == 200
-    response_lower_json = response_lower.json()
-    
-    assert len(response_lower_json["articles"]) == 0
-    assert response_lower_json["total"] == 0
-    assert response_lower_json["active_filters"] == {"llm_category": "news"}
-    
-    # Test with exact case
-    response_exact = await async_client.get("/api/db/articles?llm_category=News")
-    assert response_exact.status_code == 200
-    response_exact_json = response_exact.json()
-    
-    assert len(response_exact_json["articles"]) == 1
-    assert response_exact_json["total"] == 1
-    assert response_exact_json["active_filters"] == {"llm_category": "News"}
-    assert_articles_match_titles(response_exact_json["articles"], {"Positive News Today"})
@@ -0,0 +1,55 @@
+import pytest
+
+from app.services import llm_cache
+from app.services.llm_cache import LLMCache
+
+
+def test_make_key_is_stable_across_dict_order():
+    first = LLMCache.make_key({"model": "m", "messages": [{"role": "user", "content": "hi"}], "temperature": 0})
+    second = LLMCache.make_key({"temperature": 0, "messages": [{"role": "user", "content": "hi"}], "model": "m"})
+
+    assert first == second
+    assert first != LLMCache.make_key({"model": "other", "messages": [{"role": "user", "content": "hi"}], "temperature": 0})
+
+
+@pytest.mark.asyncio
+async def test_get_tracks_hits_and_misses():
+    cache = LLMCache()
+
+    assert await cache.get("key") is None
+    await cache.set("key", '{"category": "Science"}')
+    assert await cache.get("key") == '{"category": "Science"}'
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now)
+    cache = LLMCache(ttl_seconds=60)
+    await cache.set("key", "value")
+
+    now += 61
+    assert await cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache(max_entries=2)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    await cache.get("a")
+    await cache.set("c", "3")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "1"
+    assert await cache.get("c") == "3"
+
+
+@pytest.mark.asyncio
+async def test_entries_persist_to_sqlite(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite3")
+    await LLMCache(path=path).set("key", "value")
+
+    assert await LLMCache(path=path).get("key") == "value"
@@ -0,0 +1,241 @@
+import asyncio
+import orjson
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.services.llm_service import (
+    JsonObjectTracker,
+    LLMService,
+    SYSTEM_MESSAGE,
+    close_clients,
+    escape_curly_braces_except_content,
+    repair_incomplete_json,
+    schema_token_budget,
+    split_prompt_template,
+)
+
+
+class FakeStream:
+    """Minimal stand-in for the OpenAI client's streamed chat completion."""
+
+    def __init__(self, *pieces: str):
+        self.pieces = pieces
+        self.consumed = 0
+        self.close = AsyncMock()
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            self.consumed += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece, tool_calls=None))])
+
+
+def make_completion(content: str):
+    """Builds a streamed chat completion that delivers the content in one chunk."""
+    return FakeStream(content)
+
+
+@pytest.fixture
+def llm_service():
+    """Provides an LLMService whose async OpenAI client is replaced by a mock."""
+    service = LLMService(api_key="test_openai_api_key")
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=AsyncMock(return_value=make_completion('{"category": "Science"}'))
+    )))
+    return service
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_awaits_async_client(llm_service):
+    result = await llm_service.analyze_content("Some article text.", "Analyze the article: {content}")
+
+    assert result == {"analysis_text": '{"category": "Science"}'}
+    create = llm_service.client.chat.completions.create
+    create.assert_awaited_once()
+    assert create.await_args.kwargs["messages"][-1]["content"] == "Analyze the article: Some article text."
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_reuses_cached_response_at_temperature_zero(llm_service):
+    for _ in range(2):
+        result = await llm_service.analyze_content("Same text.", "Analyze: {content}", temperature=0)
+        assert result == {"analysis_text": '{"category": "Science"}'}
+
+    llm_service.client.chat.completions.create.assert_awaited_once()
+    assert llm_service.cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_skips_cache_for_sampled_requests(llm_service):
+    for _ in range(2):
+        await llm_service.analyze_content("Same text.", "Analyze: {content}", temperature=0.3)
+
+    assert llm_service.client.chat.completions.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_does_not_cache_responses_that_break_the_schema(llm_service):
+    schema = {"type": "object", "required": ["category"], "properties": {"category": {"enum": ["Science", "Politics"]}}}
+    llm_service.client.chat.completions.create.side_effect = lambda **kwargs: make_completion('{"category": "Gardening"}')
+    for _ in range(2):
+        result = await llm_service.analyze_content("Same text.", "Analyze: {content}", temperature=0, json_schema=schema)
+        assert result["error"].startswith("Schema validation failed")
+
+    assert llm_service.client.chat.completions.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_warns_when_content_is_not_last(llm_service, caplog):
+    await llm_service.analyze_content("Text.", "Content: {content}\nNow analyze it.")
+
+    assert "does not end with '{content}'" in caplog.text
+    messages = llm_service.client.chat.completions.create.await_args.kwargs["messages"]
+    assert messages[0] is SYSTEM_MESSAGE
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('{"a": 1}', '{"a": 1}'),
+    ('  {"a": {"b": "}"}} trailing text', '{"a": {"b": "}"}}'),
+    ('{"a": 1}{"b": 2}', '{"a": 1}'),
+    ('{"a": "unterminated', None),
+    ('["not", "an", "object"]', None),
+])
+def test_repair_incomplete_json(raw, expected):
+    assert repair_incomplete_json(raw) == expected
+
+
+def test_split_prompt_template_matches_escaped_format():
+    template = 'Schema: {"key": "value"} {{already escaped}}\nContent: {content}'
+    expected = escape_curly_braces_except_content(template).format(content="A {braced} article")
+
+    assert "A {braced} article".join(split_prompt_template(template)) == expected
+
+
+@pytest.mark.asyncio
+async def test_batch_round_trip_returns_results_by_custom_id(llm_service):
+    schema = {"type": "object", "properties": {"category": {"type": "string"}}}
+    output_lines = [
+        b'{"custom_id": "a1", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": null, '
+        b'"tool_calls": [{"function": {"arguments": "{\\"category\\": \\"Science\\"}"}}]}}]}}}',
+        b'{"custom_id": "a2", "response": {"status_code": 500, "body": {"error": "server error"}}}',
+    ]
+    llm_service.client.files = SimpleNamespace(
+        create=AsyncMock(return_value=SimpleNamespace(id="file-in")),
+        content=AsyncMock(return_value=SimpleNamespace(content=b"\n".join(output_lines))),
+    )
+    llm_service.client.batches = SimpleNamespace(
+        create=AsyncMock(return_value=SimpleNamespace(id="batch-1")),
+        retrieve=AsyncMock(side_effect=[
+            SimpleNamespace(status="in_progress"),
+            SimpleNamespace(status="completed", output_file_id="file-out"),
+        ]),
+    )
+
+    batch_id = await llm_service.submit_batch([
+        ("a1", "First text.", "Analyze: {content}", schema),
+        ("a2", "Second text.", "Analyze: {content}", schema),
+    ])
+    results = await llm_service.wait_for_batch(batch_id, json_schema=schema, poll_interval=0)
+
+    assert batch_id == "batch-1"
+    uploaded_lines = llm_service.client.files.create.await_args.kwargs["file"][1].splitlines()
+    assert len(uploaded_lines) == 2
+    assert results["a1"] == {"analysis_text": '{"category": "Science"}', "parsed": {"category": "Science"}}
+    assert "error" in results["a2"]
+
+
+def test_settings_unescape_url_colon():
+    from config.settings import Settings
+
+    assert Settings(OPENAI_BASE_URL="http\\x3a//localhost\\x3a1234/v1").OPENAI_BASE_URL == "http://localhost:1234/v1"
+
+
+def test_services_share_one_client_per_configuration():
+    first = LLMService(api_key="shared_key", base_url="http://localhost:1234/v1")
+    second = LLMService(api_key="shared_key", base_url="http://localhost:1234/v1")
+    other = LLMService(api_key="shared_key", base_url="http://localhost:5678/v1")
+
+    assert first.client is second.client
+    assert other.client is not first.client
+
+
+@pytest.mark.asyncio
+async def test_services_get_a_new_client_after_close_clients():
+    service = LLMService(api_key="restart_key", base_url="http://localhost:1234/v1")
+    closed_client = service.client
+
+    await close_clients()
+
+    assert closed_client.is_closed()
+    assert service.client is not closed_client
+    assert not service.client.is_closed()
+
+
+def test_schema_token_budget_is_bounded_and_memoized():
+    small_schema = {"type": "object"}
+    large_schema = {"type": "object", "description": "x" * 5000}
+
+    assert schema_token_budget(small_schema) == 1000
+    assert schema_token_budget(large_schema) == 4000
+    large_schema["description"] = ""  # Schemas are treated as immutable once seen
+    assert schema_token_budget(large_schema) == 4000
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_rejects_responses_that_break_the_schema(llm_service):
+    schema = {"type": "object", "required": ["category"], "properties": {"category": {"enum": ["Science", "Politics"]}}}
+    llm_service.client.chat.completions.create.return_value = make_completion('{"category": "Gardening"}')
+
+    result = await llm_service.analyze_content("Text.", "Analyze: {content}", json_schema=schema)
+
+    assert orjson.loads(result["analysis_text"])["error"].startswith("Schema validation failed")
+    assert result["error"].startswith("Schema validation failed")
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_stops_streaming_once_the_object_is_complete(llm_service):
+    stream = FakeStream('{"category": "Sci', 'ence", "note": "a } in text"}', ' trailing', ' never read')
+    llm_service.client.chat.completions.create.return_value = stream
+
+    result = await llm_service.analyze_content("Text.", "Analyze: {content}")
+
+    assert result == {"analysis_text": '{"category": "Science", "note": "a } in text"}'}
+    assert stream.consumed == 2
+    stream.close.assert_awaited_once()
+    assert llm_service.client.chat.completions.create.await_args.kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_reuses_tool_definitions_per_schema(llm_service):
+    schema = {"type": "object"}
+    for _ in range(2):
+        await llm_service.analyze_content("Text.", "Analyze: {content}", json_schema=schema)
+
+    first_call, second_call = llm_service.client.chat.completions.create.await_args_list
+    assert first_call.kwargs["tools"] is second_call.kwargs["tools"]
+    assert first_call.kwargs["tools"][0]["function"]["parameters"] is schema
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_coalesces_concurrent_identical_requests(llm_service):
+    results = await asyncio.gather(*[
+        llm_service.analyze_content("Same wire story.", "Analyze: {content}") for _ in range(3)
+    ])
+
+    assert all(result == {"analysis_text": '{"category": "Science"}'} for result in results)
+    llm_service.client.chat.completions.create.assert_awaited_once()
+    assert llm_service._inflight == {}
+
+
+@pytest.mark.parametrize("chunks, expected_end", [
+    (['{"a": "x}"}', ' tail'], (0, 11)),
+    (['{"a": "quote \\', '" and } brace"}tail'], (1, 15)),
+    (['prefix {"a": {"b": 1}', ', "c": "\\\\"}', '}'], (1, 12)),
+    (['{"a": "unterminated'], None),
+])
+def test_json_object_tracker_finds_the_end_of_the_first_object(chunks, expected_end):
+    tracker = JsonObjectTracker()
+    ends = [tracker.feed(chunk) for chunk in chunks]
+
+    completed = [(index, end) for index, end in enumerate(ends) if end != -1]
+    assert (completed[0] if completed else None) == expected_end
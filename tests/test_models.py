@@ -2,18 +2,20 @@ import pytest
 from datetime import datetime, timezone, timedelta
 from pydantic import ValidationError
 
-from app.models.article import Article # Adjust import if your structure differs
+from app.models.article import Article, tokenize_key_claim # Adjust import if your structure differs
+
+# Fixed timestamp for fields whose value is arbitrary; fetched_date checks still read the clock
+NOW = datetime.now(timezone.utc)
 
 
 def test_article_creation_valid():
     """Test successful creation of an Article with all required fields and valid types."""
-    now = datetime.now(timezone.utc)
     article_data = {
         "title": "Test Title",
         "url": "http://example.com/article1",
         "source_name": "Example Source",
         "source_type": "rss",  # Adding required source_type field
-        "publication_date": now - timedelta(days=1),
+        "publication_date": NOW - timedelta(days=1),
         "summary": "This is a test summary.",
         "content": "This is the full text of the test article.",
         "llm_category": "Technology",
@@ -24,6 +26,7 @@ def test_article_creation_valid():
         "llm_deep_analysis_results": {"deep": "analysis"},
         "related_article_ids": []  # Adding the new related_article_ids field
     }
+    created_after = datetime.now(timezone.utc)
     article = Article(**article_data)
 
     assert article.title == article_data["title"]
@@ -36,8 +39,8 @@ def test_article_creation_valid():
     # Check fetched_date is set and timezone-aware
     assert article.fetched_date is not None
     assert article.fetched_date.tzinfo == timezone.utc
-    # Check it's recent (e.g., within the last few seconds)
-    assert (now - article.fetched_date).total_seconds() < 5 
+    # Check it was set when the article was created
+    assert created_after <= article.fetched_date <= datetime.now(timezone.utc)
 
     # Check LLM fields
     assert article.llm_category == article_data["llm_category"]
@@ -51,13 +54,14 @@ def test_article_creation_valid():
     assert article.id is None
 
 def test_article_creation_minimal():
-    """Test successful creation with only absolutely required fields."""
+    """Test successful creation with only absolutely required fields, and the fetched_date default."""
     article_data = {
         "title": "Minimal Test Title",
         "url": "http://minimal.example.com/",
         "source_name": "Minimal Source",
         "source_type": "manual"  # Adding required source_type field
     }
+    created_after = datetime.now(timezone.utc)
     article = Article(**article_data)
     assert article.title == article_data["title"]
     assert str(article.url) == article_data["url"]
@@ -74,8 +78,9 @@ def test_article_creation_minimal():
     assert article.llm_analysis_raw_response is None
     assert article.llm_deep_analysis_results is None
 
-    assert article.fetched_date is not None
+    # fetched_date defaults to the creation time, in UTC
     assert article.fetched_date.tzinfo == timezone.utc
+    assert created_after <= article.fetched_date <= datetime.now(timezone.utc)
 
 def test_article_invalid_url():
     """Test Pydantic validation for an invalid URL."""
@@ -86,43 +91,46 @@ def test_article_invalid_url():
             source_name="Test Source",
             source_type="rss"
         )
-    assert "url" in str(excinfo.value).lower() # Check that the error message mentions 'url'
-    # More specific error checking if needed:
-    # assert any(e['type'] == 'url_type' for e in excinfo.value.errors())
+    assert any(e['loc'] == ('url',) for e in excinfo.value.errors()) # The error is reported against 'url'
 
-def test_article_publication_date_handling():
+@pytest.mark.parametrize("publication_date", [NOW, None])
+def test_article_publication_date_handling(publication_date):
     """Test that publication_date can be None or a datetime object."""
-    now = datetime.now(timezone.utc)
-    
-    # With publication_date
-    article1 = Article(
-        title="Date Test 1", 
-        url="http://example.com/date1", 
+    article = Article(
+        title="Date Test", 
+        url="http://example.com/date", 
         source_name="Date Source",
         source_type="rss",
-        publication_date=now
+        publication_date=publication_date
     )
-    assert article1.publication_date == now
+    assert article.publication_date == publication_date
 
-    # Without publication_date (should be None)
-    article2 = Article(
-        title="Date Test 2", 
-        url="http://example.com/date2", 
-        source_name="Date Source",
-        source_type="rss"
+def test_article_llm_entities_normalized():
+    """Test that legacy string entities and dict entities both load in the {"text", "type"} shape."""
+    article = Article(
+        title="Entities Test",
+        url="http://example.com/entities",
+        source_name="Entities Source",
+        source_type="rss",
+        llm_entities=["OpenAI", {"text": "Senate", "type": "ORG"}, {"type": "PERSON"}]
     )
-    assert article2.publication_date is None
+    assert article.llm_entities == [{"text": "OpenAI"}, {"text": "Senate", "type": "ORG"}]
 
-def test_article_fetched_date_default_timezone_aware():
-    """Test that fetched_date is automatically set and is timezone-aware (UTC)."""
+def test_article_scoring_properties():
+    """Test the cached keyword, entity and title-token views used for related-article scoring."""
     article = Article(
-        title="Fetched Date Test", 
-        url="http://example.com/fetched", 
-        source_name="Fetched Source",
-        source_type="manual"
+        title="The Senate Budget Vote",
+        url="http://example.com/scoring",
+        source_name="Scoring Source",
+        source_type="rss",
+        llm_keywords=["budget", "senate", "budget"],
+        llm_entities=[{"text": "Senate", "type": "ORG"}, "Senate", "Congress"]
     )
-    assert article.fetched_date is not None
-    assert article.fetched_date.tzinfo == timezone.utc
-    # Check it's very recent
-    assert (datetime.now(timezone.utc) - article.fetched_date).total_seconds() < 2
+    assert article.distinct_keywords == ["budget", "senate"]
+    assert article.entity_texts == ["Senate", "Congress"]
+    assert article.title_tokens == ["budget", "senate", "vote"]
+    assert "title_tokens" not in article.model_dump()
 
+def test_tokenize_key_claim_keeps_significant_words_in_order():
+    """Test that key-claim tokens drop stop words and short words but keep first-seen order."""
+    assert tokenize_key_claim("The Senate approved the budget that the Senate drafted") == ["senate", "approved", "budget", "drafted"]
@@ -0,0 +1,61 @@
+import feedparser
+import httpx
+import pytest
+
+from app.services import rss_fetcher
+
+RSS_BODY = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Test Feed 1</title>
+<item><title>Article 1</title><link>http://test.com/article1</link>
+<pubDate>Sun, 01 Jan 2023 12:00:00 GMT</pubDate><description>Summary 1</description></item>
+</channel></rss>"""
+
+
+@pytest.fixture(autouse=True)
+def parse_pool():
+    yield
+    rss_fetcher.shutdown_parse_pool()
+    rss_fetcher._feed_validators.clear()
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_articles_async_skips_failing_feeds():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if str(request.url) == "http://test.com/rss1":
+            return httpx.Response(200, content=RSS_BODY, headers={"content-type": "application/rss+xml"})
+        return httpx.Response(500)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        articles = await rss_fetcher.fetch_all_articles_async(client)
+
+    assert [article.title for article in articles] == ["Article 1"]
+    assert articles[0].source_name == "Test Feed 1"
+    assert articles[0].summary == "Summary 1"
+    assert articles[0].publication_date.year == 2023
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_articles_async_skips_unmodified_feeds():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=RSS_BODY, headers={"ETag": '"v1"'})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        first = await rss_fetcher.fetch_all_articles_async(client)
+        second = await rss_fetcher.fetch_all_articles_async(client)
+
+    assert len(first) == 2  # One article from each of the two test feeds
+    assert second == []
+
+
+def test_entries_to_articles_drops_only_invalid_entries():
+    parsed_feed = feedparser.parse(RSS_BODY.replace(
+        b"</channel>",
+        b"<item><title>No link</title></item><item><title>Article 2</title><link>http://test.com/article2</link></item></channel>"
+    ))
+
+    articles = rss_fetcher._entries_to_articles(parsed_feed, "http://test.com/rss1")
+
+    assert [article.title for article in articles] == ["Article 1", "Article 2"]
+    assert articles[1].publication_date is not None